@@ -8,7 +8,55 @@ import numpy as np
 from typing import Optional, Tuple, List
 from dataclasses import dataclass
 from enum import Enum
-import random
+import os
+import threading
+
+from game_fast import NUMBA_AVAILABLE
+
+if NUMBA_AVAILABLE:
+    from game_fast import grid_score, encode_into, apply_move_inplace
+
+
+# Row v is the one-hot encoding of die value v over values 1-6; row 0 (empty) is all zeros
+ONE_HOT = np.eye(7, dtype=np.float32)[:, 1:]
+
+# Column lookup tables indexed by a 9-bit column key: cell0 | cell1 << 3 | cell2 << 6.
+# Cells hold 0-6, so every one of the 7^3 possible columns has a unique key.
+NUM_COLUMN_KEYS = 512
+COL_SCORE = np.zeros(NUM_COLUMN_KEYS, dtype=np.int32)
+COL_FULL = np.zeros(NUM_COLUMN_KEYS, dtype=bool)
+COL_EMPTY_ROW = np.full(NUM_COLUMN_KEYS, -1, dtype=np.int8)  # -1 = full
+COL_CELLS = np.zeros((NUM_COLUMN_KEYS, 3), dtype=np.int8)
+# COL_COMPACT[die, key] is the key after removing every die showing `die` and
+# shifting the remaining dice toward row 0
+COL_COMPACT = np.zeros((7, NUM_COLUMN_KEYS), dtype=np.int16)
+
+
+def _build_column_tables() -> None:
+    """Fill the column lookup tables (runs once at import)."""
+    for c0 in range(7):
+        for c1 in range(7):
+            for c2 in range(7):
+                cells = (c0, c1, c2)
+                key = c0 | (c1 << 3) | (c2 << 6)
+                COL_SCORE[key] = sum(v * cells.count(v) ** 2 for v in set(cells) if v > 0)
+                COL_FULL[key] = 0 not in cells
+                if 0 in cells:
+                    COL_EMPTY_ROW[key] = cells.index(0)
+                COL_CELLS[key] = cells
+                for die in range(1, 7):
+                    r0, r1, r2 = [v for v in cells if v != die] + [0] * cells.count(die)
+                    COL_COMPACT[die, key] = r0 | (r1 << 3) | (r2 << 6)
+
+
+_build_column_tables()
+
+# Plain-list mirrors: indexing a list with a Python int is much cheaper than
+# indexing an ndarray, and these are hit on every move
+_COL_SCORE = COL_SCORE.tolist()
+_COL_FULL = COL_FULL.tolist()
+_COL_EMPTY_ROW = COL_EMPTY_ROW.tolist()
+_COL_COMPACT = COL_COMPACT.tolist()
 
 
 class Player(Enum):
@@ -24,13 +72,34 @@ class GamePhase(Enum):
 
 @dataclass
 class GameState:
-    """Represents the current state of a Knucklebones game."""
+    """
+    Represents the current state of a Knucklebones game.
+
+    States produced by apply_roll and apply_move may share grids they did not
+    change with the state they came from, so grids must be treated as
+    read-only. Use copy() to get a state that is safe to mutate.
+
+    Grids are C-contiguous int8 arrays from construction on, which the numba
+    kernels and column-key tables rely on. They are deliberately not flagged
+    read-only: setting the flag on each new grid measured about 25% of
+    apply_move's cost.
+    """
     # Each grid is 3 columns x 3 rows, values 0-6 (0 = empty)
     grid1: np.ndarray  # shape (3, 3)
     grid2: np.ndarray  # shape (3, 3)
     current_player: Player
     current_die: Optional[int]  # 1-6 or None
     phase: GamePhase
+    # Running grid scores, kept up to date by apply_move. Computed from the
+    # grids when left out, so a state built from populated grids is consistent.
+    score1: Optional[int] = None
+    score2: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.score1 is None:
+            self.score1 = int(calculate_grid_score(self.grid1))
+        if self.score2 is None:
+            self.score2 = int(calculate_grid_score(self.grid2))
     
     @classmethod
     def new_game(cls) -> "GameState":
@@ -51,6 +120,8 @@ class GameState:
             current_player=self.current_player,
             current_die=self.current_die,
             phase=self.phase,
+            score1=self.score1,
+            score2=self.score2,
         )
     
     def get_current_grid(self) -> np.ndarray:
@@ -62,63 +133,128 @@ class GameState:
         return self.grid2 if self.current_player == Player.PLAYER1 else self.grid1
 
 
+def state_key(state: GameState) -> Tuple[bytes, bytes, Player, Optional[int], GamePhase]:
+    """Get a hashable key identifying a state's grids, mover, die and phase."""
+    return (
+        state.grid1.tobytes(),
+        state.grid2.tobytes(),
+        state.current_player,
+        state.current_die,
+        state.phase,
+    )
+
+
+def column_key(column: np.ndarray) -> int:
+    """Pack a column's three cells into its 9-bit lookup table key."""
+    c0, c1, c2 = column.tolist()
+    return c0 | (c1 << 3) | (c2 << 6)
+
+
+def grid_column_keys(grid: np.ndarray) -> List[int]:
+    """Get the lookup table key of each column in a grid."""
+    return [c0 | (c1 << 3) | (c2 << 6) for c0, c1, c2 in grid.tolist()]
+
+
 def calculate_column_score(column: np.ndarray) -> int:
     """Calculate the score for a single column."""
-    counts = np.zeros(7, dtype=np.int32)  # indices 1-6 used
-    for v in column:
-        if v > 0:
-            counts[v] += 1
-    
-    total = 0
-    for value in range(1, 7):
-        count = counts[value]
-        total += value * count * count
-    return total
+    return _COL_SCORE[column_key(column)]
 
 
 def calculate_grid_score(grid: np.ndarray) -> int:
     """Calculate the total score for a grid."""
-    total = 0
-    for col in range(3):
-        total += calculate_column_score(grid[col])
-    return total
+    if NUMBA_AVAILABLE:
+        return grid_score(grid)
+    k0, k1, k2 = grid_column_keys(grid)
+    return _COL_SCORE[k0] + _COL_SCORE[k1] + _COL_SCORE[k2]
 
 
 def is_column_full(grid: np.ndarray, col: int) -> bool:
     """Check if a column is full."""
-    return np.all(grid[col] != 0)
+    return _COL_FULL[column_key(grid[col])]
 
 
 def is_grid_full(grid: np.ndarray) -> bool:
     """Check if a grid is completely full."""
-    return np.all(grid != 0)
+    # Byte search on the int8 cells avoids building and reducing a boolean array
+    return b"\x00" not in grid.tobytes()
 
 
 def get_legal_columns(state: GameState) -> List[int]:
     """Get list of legal column indices (not full)."""
-    grid = state.get_current_grid()
-    return [col for col in range(3) if not is_column_full(grid, col)]
+    keys = grid_column_keys(state.get_current_grid())
+    return [col for col in range(3) if not _COL_FULL[keys[col]]]
+
+
+def column_move_gain(my_key: int, opp_key: int, die_value: int) -> int:
+    """
+    Score swing of placing die_value in a column, from the mover's view.
+
+    Takes the column's keys in the mover's and opponent's grids; the column
+    must not be full (e.g. it came from get_legal_columns). Returns the
+    mover's score gain plus the opponent's score loss.
+    """
+    row = _COL_EMPTY_ROW[my_key]
+    assert row >= 0, "column is full"
+    placed = my_key | (die_value << (3 * row))
+    return (_COL_SCORE[placed] - _COL_SCORE[my_key]) + (
+        _COL_SCORE[opp_key] - _COL_SCORE[_COL_COMPACT[die_value][opp_key]]
+    )
 
 
 def get_empty_row(grid: np.ndarray, col: int) -> Optional[int]:
     """Get the first empty row in a column, or None if full."""
-    for row in range(3):
-        if grid[col, row] == 0:
-            return row
-    return None
+    row = _COL_EMPTY_ROW[column_key(grid[col])]
+    return None if row < 0 else row
+
+
+# Dice are drawn from a pre-generated buffer: one vectorized draw serves
+# ROLL_BUFFER_SIZE rolls. Buffers are per thread so threaded self-play
+# games never hand out the same roll twice.
+ROLL_BUFFER_SIZE = 1 << 16
+_roll_state = threading.local()
+
+
+def _reset_roll_state() -> None:
+    """Drop all roll buffers so they are redrawn from a fresh generator."""
+    global _roll_state
+    _roll_state = threading.local()
+
+
+# A forked worker would otherwise replay its parent's buffered rolls
+os.register_at_fork(after_in_child=_reset_roll_state)
+
+
+def seed_rolls(seed: Optional[int] = None) -> None:
+    """Reseed the calling thread's dice (None = fresh OS entropy), dropping buffered rolls."""
+    _roll_state.rng = np.random.default_rng(seed)
+    _roll_state.index = ROLL_BUFFER_SIZE
 
 
 def roll_die() -> int:
     """Roll a die (1-6)."""
-    return random.randint(1, 6)
+    local = _roll_state
+    index = getattr(local, "index", ROLL_BUFFER_SIZE)
+    if index >= ROLL_BUFFER_SIZE:
+        if not hasattr(local, "rng"):
+            local.rng = np.random.default_rng()
+        local.rolls = local.rng.integers(1, 7, size=ROLL_BUFFER_SIZE).tolist()
+        index = 0
+    local.index = index + 1
+    return local.rolls[index]
 
 
 def apply_roll(state: GameState, die_value: int) -> GameState:
     """Apply a die roll to transition from rolling to placing phase."""
-    new_state = state.copy()
-    new_state.current_die = die_value
-    new_state.phase = GamePhase.PLACING
-    return new_state
+    # Rolling never touches the grids, so the new state shares them
+    return GameState(
+        grid1=state.grid1,
+        grid2=state.grid2,
+        current_player=state.current_player,
+        current_die=die_value,
+        phase=GamePhase.PLACING,
+        score1=state.score1,
+        score2=state.score2,
+    )
 
 
 def apply_move(state: GameState, col: int) -> Optional[GameState]:
@@ -127,45 +263,75 @@ def apply_move(state: GameState, col: int) -> Optional[GameState]:
         return None
     
     die_value = state.current_die
-    new_state = state.copy()
+    is_player1 = state.current_player == Player.PLAYER1
     
     # Get grids
-    if state.current_player == Player.PLAYER1:
-        my_grid = new_state.grid1
-        opp_grid = new_state.grid2
+    if is_player1:
+        my_grid, opp_grid = state.grid1, state.grid2
     else:
-        my_grid = new_state.grid2
-        opp_grid = new_state.grid1
-    
-    # Find empty row in column
-    row = get_empty_row(my_grid, col)
-    if row is None:
-        return None  # Column is full
+        my_grid, opp_grid = state.grid2, state.grid1
     
-    # Place die
-    my_grid[col, row] = die_value
+    if NUMBA_AVAILABLE:
+        # The kernel places the die and compacts the opponent's column in place
+        my_grid = my_grid.copy()
+        opp_grid = opp_grid.copy()
+        row, my_grid_full, my_gain, opp_loss = apply_move_inplace(
+            my_grid, opp_grid, col, die_value
+        )
+        if row < 0:
+            return None  # Column is full
+    else:
+        # Find empty row in column
+        my_key = column_key(my_grid[col])
+        row = _COL_EMPTY_ROW[my_key]
+        if row < 0:
+            return None  # Column is full
+        
+        # Place die (copy-on-write: only grids that change are copied)
+        my_grid = my_grid.copy()
+        my_grid[col, row] = die_value
+        my_gain = _COL_SCORE[my_key | (die_value << (3 * row))] - _COL_SCORE[my_key]
+        
+        # Remove matching dice from opponent's column and compact it, by table lookup
+        opp_key = column_key(opp_grid[col])
+        new_opp_key = _COL_COMPACT[die_value][opp_key]
+        opp_loss = 0
+        if new_opp_key != opp_key:
+            opp_grid = opp_grid.copy()
+            opp_grid[col] = COL_CELLS[new_opp_key]
+            opp_loss = _COL_SCORE[opp_key] - _COL_SCORE[new_opp_key]
+        
+        my_grid_full = is_grid_full(my_grid)
     
-    # Remove matching dice from opponent's column
-    opp_col = opp_grid[col]
-    mask = opp_col != die_value
-    # Compact the column (remove matching, shift down)
-    remaining = opp_col[mask]
-    new_col = np.zeros(3, dtype=np.int8)
-    new_col[:len(remaining)] = remaining
-    opp_grid[col] = new_col
+    if is_player1:
+        grid1, grid2 = my_grid, opp_grid
+        score1, score2 = state.score1 + my_gain, state.score2 - opp_loss
+    else:
+        grid1, grid2 = opp_grid, my_grid
+        score1, score2 = state.score1 - opp_loss, state.score2 + my_gain
     
     # Check if game ended
-    if is_grid_full(my_grid):
-        new_state.phase = GamePhase.ENDED
-        new_state.current_die = None
-        return new_state
+    if my_grid_full:
+        return GameState(
+            grid1=grid1,
+            grid2=grid2,
+            current_player=state.current_player,
+            current_die=None,
+            phase=GamePhase.ENDED,
+            score1=score1,
+            score2=score2,
+        )
     
     # Switch player
-    new_state.current_player = Player.PLAYER2 if state.current_player == Player.PLAYER1 else Player.PLAYER1
-    new_state.current_die = None
-    new_state.phase = GamePhase.ROLLING
-    
-    return new_state
+    return GameState(
+        grid1=grid1,
+        grid2=grid2,
+        current_player=Player.PLAYER2 if is_player1 else Player.PLAYER1,
+        current_die=None,
+        phase=GamePhase.ROLLING,
+        score1=score1,
+        score2=score2,
+    )
 
 
 def get_winner(state: GameState) -> Optional[Player]:
@@ -173,12 +339,9 @@ def get_winner(state: GameState) -> Optional[Player]:
     if state.phase != GamePhase.ENDED:
         return None
     
-    score1 = calculate_grid_score(state.grid1)
-    score2 = calculate_grid_score(state.grid2)
-    
-    if score1 > score2:
+    if state.score1 > state.score2:
         return Player.PLAYER1
-    elif score2 > score1:
+    elif state.score2 > state.score1:
         return Player.PLAYER2
     else:
         return None  # Tie
@@ -207,40 +370,32 @@ def encode_state(state: GameState) -> np.ndarray:
     
     All count features are normalized by max possible (3).
     """
-    features = np.zeros(43, dtype=np.float32)
-    idx = 0
-    
-    # Encode grid1
-    for col in range(3):
-        counts = np.zeros(7, dtype=np.int32)
-        for row in range(3):
-            v = state.grid1[col, row]
-            if v > 0:
-                counts[v] += 1
-        for die in range(1, 7):
-            features[idx] = counts[die] / 3.0
-            idx += 1
+    features = np.empty(43, dtype=np.float32)
+    encode_state_into(state, features)
+    return features
+
+
+def encode_state_into(state: GameState, out: np.ndarray) -> None:
+    """Write encode_state's 43 features into out (float32, shape (43,)), overwriting it."""
+    if NUMBA_AVAILABLE:
+        encode_into(
+            state.grid1, state.grid2, state.current_player.value,
+            state.current_die or 0, out,
+        )
+        return
     
-    # Encode grid2
-    for col in range(3):
-        counts = np.zeros(7, dtype=np.int32)
-        for row in range(3):
-            v = state.grid2[col, row]
-            if v > 0:
-                counts[v] += 1
-        for die in range(1, 7):
-            features[idx] = counts[die] / 3.0
-            idx += 1
+    # Per-column die counts: ONE_HOT[grid] is (3, 3, 6), summed over rows
+    out[0:18] = ONE_HOT[state.grid1].sum(axis=1).ravel()
+    out[18:36] = ONE_HOT[state.grid2].sum(axis=1).ravel()
+    out[0:36] /= 3.0
     
     # Current player
-    features[idx] = 0.0 if state.current_player == Player.PLAYER1 else 1.0
-    idx += 1
+    out[36] = 0.0 if state.current_player == Player.PLAYER1 else 1.0
     
     # Current die one-hot
+    out[37:43] = 0.0
     if state.current_die is not None and 1 <= state.current_die <= 6:
-        features[idx + state.current_die - 1] = 1.0
-    
-    return features
+        out[36 + state.current_die] = 1.0
 
 
 def evaluate_state(state: GameState, player: Player) -> float:
@@ -251,12 +406,11 @@ def evaluate_state(state: GameState, player: Player) -> float:
     if state.phase == GamePhase.ENDED:
         return get_game_result(state, player)
     
-    my_grid = state.grid1 if player == Player.PLAYER1 else state.grid2
-    opp_grid = state.grid2 if player == Player.PLAYER1 else state.grid1
-    
-    my_score = calculate_grid_score(my_grid)
-    opp_score = calculate_grid_score(opp_grid)
+    if player == Player.PLAYER1:
+        my_score, opp_score = state.score1, state.score2
+    else:
+        my_score, opp_score = state.score2, state.score1
     
     # Normalize by typical max score difference
     diff = (my_score - opp_score) / 200.0
-    return np.clip(diff, -1.0, 1.0)
+    return min(max(diff, -1.0), 1.0)
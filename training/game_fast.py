@@ -0,0 +1,134 @@
+"""
+Numba-compiled Kernels for Knucklebones Game Logic
+
+The game works on 3x3 int8 grids, so numpy's per-call dispatch costs far more
+than the arithmetic itself. These kernels do the hot per-state work in compiled
+loops; game.py calls them when numba is installed and falls back to its
+pure-Python paths otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def column_score(grid, col):
+        """Score one column: each value counts value * (dice showing it)^2."""
+        a = grid[col, 0]
+        b = grid[col, 1]
+        c = grid[col, 2]
+        # Each die contributes value * count, which sums to value * count^2
+        total = 0
+        if a > 0:
+            total += a * (1 + (a == b) + (a == c))
+        if b > 0:
+            total += b * (1 + (b == a) + (b == c))
+        if c > 0:
+            total += c * (1 + (c == a) + (c == b))
+        return total
+
+    @njit(cache=True)
+    def grid_score(grid):
+        """Score a whole (3, 3) grid."""
+        return column_score(grid, 0) + column_score(grid, 1) + column_score(grid, 2)
+
+    @njit(cache=True, fastmath=True)
+    def encode_into(grid1, grid2, player, die, out):
+        """
+        Write the 43-feature encoding of a state into out.
+
+        player is 0 or 1; die is 1-6, or 0 when no die is rolled.
+        """
+        out[:] = 0.0
+        for col in range(3):
+            for row in range(3):
+                v = grid1[col, row]
+                if v > 0:
+                    out[col * 6 + v - 1] += 1.0
+                v = grid2[col, row]
+                if v > 0:
+                    out[18 + col * 6 + v - 1] += 1.0
+        for i in range(36):
+            out[i] /= 3.0
+        out[36] = player
+        if 1 <= die <= 6:
+            out[36 + die] = 1.0
+
+    @njit(cache=True)
+    def apply_move_inplace(my_grid, opp_grid, col, die):
+        """
+        Place die in my_grid's column and knock matching dice out of opp_grid.
+
+        Both grids are modified in place. Returns (row_placed, my_grid_full,
+        my_score_gain, opp_score_loss); row_placed is -1, with nothing
+        modified, if the column is full.
+        """
+        row = -1
+        for r in range(3):
+            if my_grid[col, r] == 0:
+                row = r
+                break
+        if row < 0:
+            return -1, False, 0, 0
+        my_before = column_score(my_grid, col)
+        opp_before = column_score(opp_grid, col)
+        my_grid[col, row] = die
+
+        # Compact the opponent's column, dropping matching dice
+        k = 0
+        for r in range(3):
+            v = opp_grid[col, r]
+            if v != die:
+                opp_grid[col, k] = v
+                k += 1
+        for r in range(k, 3):
+            opp_grid[col, r] = 0
+
+        full = True
+        for c in range(3):
+            for r in range(3):
+                if my_grid[c, r] == 0:
+                    full = False
+        gain = column_score(my_grid, col) - my_before
+        loss = opp_before - column_score(opp_grid, col)
+        return row, full, gain, loss
+
+    @njit(cache=True)
+    def greedy_best_col(my_grid, opp_grid, die):
+        """
+        Pick the column maximizing immediate score gain plus opponent score loss.
+
+        Ties go to the lowest column; returns -1 if every column is full.
+        """
+        my_new = np.empty_like(my_grid)
+        opp_new = np.empty_like(opp_grid)
+        best_col = -1
+        best_gain = 0
+        for col in range(3):
+            my_new[:] = my_grid
+            opp_new[:] = opp_grid
+            row, _, my_gain, opp_loss = apply_move_inplace(my_new, opp_new, col, die)
+            if row < 0:
+                continue
+            gain = my_gain + opp_loss
+            if best_col < 0 or gain > best_gain:
+                best_col = col
+                best_gain = gain
+        return best_col
+
+    # Warm up at import so the first game doesn't pay for compilation
+    _grid = np.zeros((3, 3), dtype=np.int8)
+    _opp = np.zeros((3, 3), dtype=np.int8)
+    _features = np.zeros(43, dtype=np.float32)
+    grid_score(_grid)
+    encode_into(_grid, _opp, 0, 1, _features)
+    apply_move_inplace(_grid, _opp, 0, 1)
+    greedy_best_col(_grid, _opp, 1)
+    del _grid, _opp, _features
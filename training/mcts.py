@@ -4,49 +4,45 @@ Monte Carlo Tree Search for Self-Play Training
 Implements PUCT MCTS for generating training data with neural network guidance.
 """
 
+import math
+import random
+
 import numpy as np
-import torch
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 from game import (
     GameState, Player, GamePhase,
     get_legal_columns, apply_move, apply_roll, roll_die,
-    encode_state, evaluate_state, get_game_result
+    encode_state_into, evaluate_state, get_game_result, state_key
 )
-from network import PolicyValueNetwork
+from network import PolicyValueNetwork, create_inference, STATE_ENCODING_SIZE
 
 
 # MCTS hyperparameters
 C_PUCT = 1.5  # Exploration constant
 DEFAULT_SIMULATIONS = 800
+VIRTUAL_LOSS = 1.0  # Value penalty on in-flight paths during batched selection
+EVAL_CACHE_SIZE = 100_000  # Max cached network evaluations before the cache is reset
 
 
-@dataclass
-class MCTSNode:
-    """Node in the MCTS tree."""
-    visits: int = 0
-    total_value: float = 0.0
-    prior: float = 0.0
-    children: Dict[int, "MCTSNode"] = field(default_factory=dict)
-    
-    @property
-    def mean_value(self) -> float:
-        """Get mean value of this node."""
-        if self.visits == 0:
-            return 0.0
-        return self.total_value / self.visits
-    
-    def puct_score(self, parent_visits: int) -> float:
-        """Calculate PUCT score for this node."""
-        q = self.mean_value
-        u = C_PUCT * self.prior * np.sqrt(parent_visits) / (1 + self.visits)
-        return q + u
+ROOT = 0  # Node id of the search root
+
+Samples = Tuple[np.ndarray, np.ndarray, np.ndarray]  # states, policies, values
+
+# Prior used by heuristic (network-free) search; shared, so kept read-only
+UNIFORM_POLICY = np.full(3, 1.0 / 3.0)
+UNIFORM_POLICY.setflags(write=False)
 
 
 class MCTS:
     """
     Monte Carlo Tree Search with neural network guidance.
+
+    search() runs a whole search. Its steps (prepare_root, expand,
+    collect_leaves, backup_leaves, select_action) are also public, so a driver
+    can advance several trees in lockstep and evaluate their leaves elsewhere,
+    as self_play_games_parallel does.
     """
     
     def __init__(
@@ -54,8 +50,9 @@ class MCTS:
         network: Optional[PolicyValueNetwork] = None,
         simulations: int = DEFAULT_SIMULATIONS,
         temperature: float = 1.0,
-        batch_size: int = 64,
+        batch_size: int = 16,
         inference_server: Optional["InferenceServer"] = None,
+        eval_cache_size: int = EVAL_CACHE_SIZE,
     ):
         """
         Initialize MCTS.
@@ -66,16 +63,60 @@ class MCTS:
             temperature: Temperature for action selection (higher = more exploration)
             batch_size: Batch size for parallel leaf evaluation (MPS optimization)
             inference_server: Optional shared inference server for parallel games
+            eval_cache_size: Max cached network evaluations before the cache is reset
         """
         self.network = network
         self.simulations = simulations
         self.temperature = temperature
         self.batch_size = batch_size
         self.inference_server = inference_server
-        self.root = MCTSNode()
-        # Cache device reference to avoid repeated detection
-        self._device = next(network.parameters()).device if network is not None else None
+        self._reset_tree()
+        # Set by advance_root: the next search continues from the kept subtree
+        self._reuse_root = False
+        # Inference snapshot of the network; it does not change during a search
+        self._inference = create_inference(network) if network is not None else None
+        # Network evaluations keyed by state_key, so transpositions skip both
+        # encode_state and the forward pass; a separate encoding cache would only
+        # ever see the misses. Only valid while the network is unchanged, i.e.
+        # for this instance.
+        self._eval_cache: Dict[tuple, Tuple[np.ndarray, float]] = {}
+        self.eval_cache_size = eval_cache_size
+        # Reused feature buffers; each is consumed by the forward pass before
+        # the next encode, and an MCTS instance is only used from one thread.
+        # Only the local network path encodes.
+        self._features = (
+            np.zeros((batch_size, 43), dtype=np.float32) if network is not None else None
+        )
     
+    def _reset_tree(self, kept_nodes: int = 1) -> None:
+        """
+        Allocate an empty tree holding just the root.
+
+        The tree is stored as flat per-node lists indexed by node id, with
+        per-child entries at node * 3 + action, so creating a node is an
+        integer bump rather than an object allocation. Each simulation expands
+        at most one node into at most 3 children, which sizes the storage
+        on top of the kept_nodes a reused subtree brings along.
+        """
+        capacity = kept_nodes + 3 * (self.simulations + 1)
+        self._visits = [0] * capacity
+        self._total_value = [0.0] * capacity
+        self._parent = [-1] * capacity
+        self._legal: List[Optional[List[int]]] = [None] * capacity  # None until expanded
+        self._priors = [0.0] * (3 * capacity)
+        self._child_idx = [-1] * (3 * capacity)
+        self._n_nodes = 1
+
+    def _grow_tree(self) -> None:
+        """Double the tree storage (only needed if simulations run past the budget)."""
+        n = len(self._visits)
+        self._visits.extend([0] * n)
+        self._total_value.extend([0.0] * n)
+        self._parent.extend([-1] * n)
+        self._legal.extend([None] * n)
+        self._priors.extend([0.0] * (3 * n))
+        self._child_idx.extend([-1] * (3 * n))
+
     def get_policy_value(self, state: GameState) -> Tuple[np.ndarray, float]:
         """
         Get policy and value from network, inference server, or heuristic.
@@ -84,21 +125,28 @@ class MCTS:
             policy: Array of shape (3,) with probabilities for each column
             value: Value estimate in [-1, 1]
         """
+        if self.inference_server is not None or self.network is not None:
+            key = state_key(state)
+            cached = self._eval_cache.get(key)
+            if cached is not None:
+                return cached
+
         # Use inference server if available (for parallel games)
         if self.inference_server is not None:
-            return self.inference_server.infer(state)
+            policy, value = self.inference_server.infer(state)
         elif self.network is not None:
-            self.network.eval()
-            with torch.inference_mode():
-                features = encode_state(state)
-                x = torch.from_numpy(features).float().to(self._device)
-                policy, value = self.network.get_policy_value(x)
-                return policy.cpu().numpy(), value.item()
+            features = self._features[0]
+            encode_state_into(state, features)
+            policy, value = self._inference.get_policy_value(features)
+            value = float(value)
         else:
             # Uniform policy, heuristic value
-            policy = np.ones(3) / 3.0
-            value = evaluate_state(state, state.current_player)
-            return policy, value
+            return UNIFORM_POLICY, evaluate_state(state, state.current_player)
+
+        if len(self._eval_cache) >= self.eval_cache_size:
+            self._eval_cache.clear()
+        self._eval_cache[key] = (policy, value)
+        return policy, value
 
     def get_policy_value_batched(
         self, states: List[GameState]
@@ -118,34 +166,86 @@ class MCTS:
         if not states:
             return np.empty((0, 3)), np.empty(0)
 
-        # Use inference server if available (for parallel games)
-        if self.inference_server is not None:
-            return self.inference_server.infer_batch(states)
-        elif self.network is not None:
-            self.network.eval()
-            with torch.inference_mode():
-                features = np.stack([encode_state(s) for s in states])
-                x = torch.from_numpy(features).float().to(self._device)
-                log_policy, value = self.network(x)
-                policies = torch.exp(log_policy).cpu().numpy()
-                values = value.squeeze(-1).cpu().numpy()
-                return policies, values
-        else:
+        if self.inference_server is None and self.network is None:
             # Heuristic fallback
             policies = np.ones((len(states), 3)) / 3.0
             values = np.array([evaluate_state(s, s.current_player) for s in states])
             return policies, values
 
-    def expand(self, node: MCTSNode, state: GameState) -> None:
-        """Expand a node by adding children for legal moves."""
+        # Only evaluate states not already cached, each once. Hits are read out
+        # up front, since making room for the misses may clear the cache.
+        keys = [state_key(s) for s in states]
+        found: Dict[tuple, Tuple[np.ndarray, float]] = {}
+        misses: Dict[tuple, GameState] = {}
+        for key, s in zip(keys, states):
+            if key in found or key in misses:
+                continue
+            cached = self._eval_cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                misses[key] = s
+
+        if misses:
+            if len(self._eval_cache) + len(misses) > self.eval_cache_size:
+                self._eval_cache.clear()
+            policies, values = self._evaluate_batch(list(misses.values()))
+            for key, policy, value in zip(misses, policies, values):
+                found[key] = self._eval_cache[key] = (policy, float(value))
+
+        results = [found[key] for key in keys]
+        policies = np.array([policy for policy, _ in results])
+        values = np.array([value for _, value in results])
+        return policies, values
+
+    def _evaluate_batch(self, states: List[GameState]) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the network (or inference server) on a batch of states, uncached."""
+        # Use inference server if available (for parallel games)
+        if self.inference_server is not None:
+            return self.inference_server.infer_batch(states)
+
+        if len(states) > len(self._features):
+            self._features = np.zeros((len(states), 43), dtype=np.float32)
+        features = self._features[:len(states)]
+        for row, s in zip(features, states):
+            encode_state_into(s, row)
+        return self._inference.get_policy_value(features)
+
+    def expand(
+        self, node: int, state: GameState, policy: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Expand a node by adding children for legal moves.
+
+        Args:
+            node: Id of the node to expand
+            state: Game state at the node
+            policy: Precomputed policy priors (evaluated here if None)
+        """
         legal_cols = get_legal_columns(state)
         if not legal_cols:
             return
         
         # Get policy priors
-        policy, _ = self.get_policy_value(state)
+        if policy is None:
+            policy, _ = self.get_policy_value(state)
+        priors = self._legal_priors(policy, legal_cols)
         
-        # Mask and renormalize for legal moves
+        # Create children
+        if self._n_nodes + len(legal_cols) > len(self._visits):
+            self._grow_tree()
+        base = node * 3
+        for col in legal_cols:
+            child = self._n_nodes
+            self._n_nodes += 1
+            self._parent[child] = node
+            self._child_idx[base + col] = child
+            self._priors[base + col] = priors[col]
+        self._legal[node] = legal_cols
+    
+    @staticmethod
+    def _legal_priors(policy: np.ndarray, legal_cols: List[int]) -> List[float]:
+        """Mask a policy to the legal columns and renormalize it."""
         mask = np.zeros(3)
         mask[legal_cols] = 1.0
         masked_policy = policy * mask
@@ -154,21 +254,30 @@ class MCTS:
             masked_policy /= sum_policy
         else:
             masked_policy[legal_cols] = 1.0 / len(legal_cols)
-        
-        # Create children
-        for col in legal_cols:
-            node.children[col] = MCTSNode(prior=masked_policy[col])
-    
-    def select_child(self, node: MCTSNode) -> Optional[int]:
-        """Select best child according to PUCT."""
-        if not node.children:
+        return masked_policy.tolist()
+
+    def select_child(self, node: int) -> Optional[int]:
+        """Select best child according to PUCT (argmax over legal columns)."""
+        legal = self._legal[node]
+        if not legal:
             return None
 
+        visits = self._visits
+        total_value = self._total_value
+        priors = self._priors
+        child_idx = self._child_idx
+        base = node * 3
+        # Computed once per node, with math.sqrt to avoid numpy scalar overhead
+        u_scale = C_PUCT * math.sqrt(visits[node])
+
         best_action = None
         best_score = float("-inf")
 
-        for action, child in node.children.items():
-            score = child.puct_score(node.visits)
+        for action in legal:
+            child = child_idx[base + action]
+            n = visits[child]
+            q = total_value[child] / n if n else 0.0
+            score = q + u_scale * priors[base + action] / (1 + n)
             if score > best_score:
                 best_score = score
                 best_action = action
@@ -177,12 +286,14 @@ class MCTS:
 
     def _select_path(
         self, state: GameState, root_player: Player
-    ) -> Tuple[
-        List[Tuple[MCTSNode, Optional[int]]], Optional[MCTSNode], Optional[GameState], Optional[float]
-    ]:
+    ) -> Tuple[int, Optional[GameState], Optional[float]]:
         """
         Select a path from root to leaf, applying virtual losses.
 
+        Each visited node gets its visit counted and VIRTUAL_LOSS subtracted
+        from its value, so later selections in the same batch are steered to
+        other paths. _backup adds VIRTUAL_LOSS back while walking to the root.
+
         Used by batched search to collect multiple leaves for batch evaluation.
 
         Args:
@@ -190,47 +301,52 @@ class MCTS:
             root_player: Player from whose perspective to evaluate
 
         Returns:
-            path: List of (node, action) tuples
-            leaf_node: The leaf node needing expansion (or None if terminal)
-            leaf_state: The game state at the leaf
+            node: Id of the node the path ended on
+            leaf_state: The game state at the leaf if it needs expansion (else None)
             terminal_value: If terminal state reached, the game result (else None)
         """
-        node = self.root
-        path: List[Tuple[MCTSNode, Optional[int]]] = [(node, None)]
-        current_state = state.copy()
+        visits = self._visits
+        total_value = self._total_value
+        node = ROOT
+        current_state = state
 
         while True:
-            node.visits += 1  # Virtual loss
+            visits[node] += 1
+            total_value[node] -= VIRTUAL_LOSS
 
             # Terminal state
             if current_state.phase == GamePhase.ENDED:
-                value = get_game_result(current_state, root_player)
-                return path, None, None, value
+                return node, None, get_game_result(current_state, root_player)
 
             # Handle rolling phase (chance node)
             if current_state.phase == GamePhase.ROLLING:
                 die_value = roll_die()
                 current_state = apply_roll(current_state, die_value)
-                continue
 
             # Leaf node - needs expansion
-            if not node.children:
-                return path, node, current_state, None
+            if not self._legal[node]:
+                return node, current_state, None
 
             # Select action and descend
             action = self.select_child(node)
             if action is None:
-                value = evaluate_state(current_state, root_player)
-                return path, None, None, value
+                return node, None, evaluate_state(current_state, root_player)
 
             new_state = apply_move(current_state, action)
             if new_state is None:
-                value = evaluate_state(current_state, root_player)
-                return path, None, None, value
+                return node, None, evaluate_state(current_state, root_player)
 
             current_state = new_state
-            node = node.children[action]
-            path.append((node, action))
+            node = self._child_idx[node * 3 + action]
+
+    def _backup(self, node: int, value: float) -> None:
+        """Add value to node and each ancestor, undoing their virtual loss."""
+        parent = self._parent
+        total_value = self._total_value
+        value += VIRTUAL_LOSS
+        while node >= 0:
+            total_value[node] += value
+            node = parent[node]
 
     def simulate(self, state: GameState, root_player: Player) -> float:
         """
@@ -239,78 +355,164 @@ class MCTS:
         Returns:
             Value from root_player's perspective
         """
-        node = self.root
-        path: List[Tuple[MCTSNode, Optional[int]]] = [(node, None)]
-        current_state = state.copy()
-        
-        # Selection and expansion
-        while True:
-            node.visits += 1
-            
-            # Terminal state
-            if current_state.phase == GamePhase.ENDED:
-                value = get_game_result(current_state, root_player)
-                break
-            
-            # Handle rolling phase (chance node)
-            if current_state.phase == GamePhase.ROLLING:
-                die_value = roll_die()
-                current_state = apply_roll(current_state, die_value)
-                continue
-            
-            # Expand if needed
-            if not node.children:
-                self.expand(node, current_state)
-                
-                if not node.children:
-                    # No legal moves (shouldn't happen in normal play)
-                    value = evaluate_state(current_state, root_player)
-                    break
-                
-                # Evaluate with network and return
-                _, value = self.get_policy_value(current_state)
+        node, leaf_state, value = self._select_path(state, root_player)
+
+        # Expand the leaf and evaluate it
+        if leaf_state is not None:
+            self.expand(node, leaf_state)
+            if not self._legal[node]:
+                # No legal moves (shouldn't happen in normal play)
+                value = evaluate_state(leaf_state, root_player)
+            else:
+                _, value = self.get_policy_value(leaf_state)
                 # Adjust for perspective
-                if current_state.current_player != root_player:
+                if leaf_state.current_player != root_player:
                     value = -value
-                break
-            
-            # Select action
-            action = self.select_child(node)
-            if action is None:
-                value = evaluate_state(current_state, root_player)
-                break
-            
-            # Apply move
-            new_state = apply_move(current_state, action)
-            if new_state is None:
-                value = evaluate_state(current_state, root_player)
-                break
-            
-            current_state = new_state
-            node = node.children[action]
-            path.append((node, action))
-        
-        # Backpropagation
-        for node, _ in path:
-            node.total_value += value
-        
+
+        self._backup(node, value)
         return value
     
-    def search(self, state: GameState) -> Tuple[int, np.ndarray]:
+    def collect_leaves(
+        self, state: GameState, root_player: Player, batch_size: int
+    ) -> List[Tuple[int, GameState]]:
         """
-        Run MCTS search and return best action and visit distribution.
-        
+        Descend the tree batch_size times under virtual loss.
+
+        Terminal paths are backpropagated immediately; the rest are returned
+        for evaluation by backup_leaves.
+
+        Returns:
+            (leaf_node, leaf_state) pairs needing evaluation
+        """
+        leaves: List[Tuple[int, GameState]] = []
+
+        for _ in range(batch_size):
+            node, leaf_state, terminal_value = self._select_path(state, root_player)
+
+            if terminal_value is not None:
+                # Terminal state - backpropagate immediately
+                self._backup(node, terminal_value)
+            elif leaf_state is not None:
+                leaves.append((node, leaf_state))
+
+        return leaves
+
+    def backup_leaves(
+        self,
+        leaves: List[Tuple[int, GameState]],
+        root_player: Player,
+        policies: np.ndarray,
+        values: np.ndarray,
+    ) -> None:
+        """Expand evaluated leaves and backpropagate their values, undoing virtual loss."""
+        for i, (leaf_node, leaf_state) in enumerate(leaves):
+            # Several descents can end on the same unexpanded leaf
+            if not self._legal[leaf_node]:
+                self.expand(leaf_node, leaf_state, policies[i])
+
+            value = float(values[i])
+            # Adjust for perspective
+            if leaf_state.current_player != root_player:
+                value = -value
+            self._backup(leaf_node, value)
+
+    @property
+    def leaf_batch_size(self) -> int:
+        """Leaves per batch; the heuristic evaluator gains nothing from batching."""
+        if self.network is None and self.inference_server is None:
+            return 1
+        return self.batch_size
+
+    def simulate_batch(
+        self, state: GameState, root_player: Player, batch_size: int
+    ) -> None:
+        """
+        Run a batch of MCTS simulations with a single network evaluation.
+
+        Descends the tree batch_size times under virtual loss, evaluates all
+        collected leaves in one batched call, then expands each leaf with its
+        policy and backpropagates its value.
+
         Args:
-            state: Current game state
-            
+            state: Root game state
+            root_player: Player from whose perspective to evaluate
+            batch_size: Number of simulations to run
+        """
+        leaves = self.collect_leaves(state, root_player, batch_size)
+        if not leaves:
+            return
+
+        # Batch evaluate all collected leaves
+        policies, values = self.get_policy_value_batched([s for _, s in leaves])
+        self.backup_leaves(leaves, root_player, policies, values)
+
+    def advance_root(self, actions: List[int]) -> bool:
+        """
+        Keep the subtree reached by playing actions from the root for the next search.
+
+        The tree is open-loop over dice (a node's statistics cover every roll
+        that reached it), so a path is just the column played at each ply.
+        Only valid when the next search's root player is the current one's,
+        since node values are from the root player's perspective.
+
         Returns:
-            action: Best action to take
-            policy: Visit count distribution over actions (for training target)
+            False, leaving the next search to start fresh, if the path leaves
+            the expanded tree
+        """
+        node = ROOT
+        for action in actions:
+            legal = self._legal[node]
+            if not legal or action not in legal:
+                self._reuse_root = False
+                return False
+            node = self._child_idx[node * 3 + action]
+        self._reuse_root = bool(self._legal[node])
+        if self._reuse_root:
+            self._reroot(node)
+        return self._reuse_root
+
+    def _reroot(self, node: int) -> None:
+        """Rebuild the tree from node's subtree, renumbering node as ROOT."""
+        visits, total_value = self._visits, self._total_value
+        legal, priors, child_idx = self._legal, self._priors, self._child_idx
+
+        # Breadth-first, so each node's new id is its position in order
+        order = [node]
+        new_id = {node: ROOT}
+        for old in order:
+            for action in legal[old] or ():
+                child = child_idx[old * 3 + action]
+                new_id[child] = len(order)
+                order.append(child)
+
+        self._reset_tree(kept_nodes=len(order))
+        for new, old in enumerate(order):
+            self._visits[new] = visits[old]
+            self._total_value[new] = total_value[old]
+            self._legal[new] = legal[old]
+            for action in legal[old] or ():
+                child = new_id[child_idx[old * 3 + action]]
+                self._priors[new * 3 + action] = priors[old * 3 + action]
+                self._child_idx[new * 3 + action] = child
+                self._parent[child] = new
+        self._n_nodes = len(order)
+
+    def prepare_root(self, state: GameState) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Reset the tree for a new search from state, unless advance_root kept
+        a subtree whose root has the same legal moves.
+
+        Unless the move is forced, the root must then be expanded (or, for a
+        kept subtree, have its priors refreshed) before collecting leaves.
+
+        Returns:
+            (action, policy) if the move is forced, else None
         """
-        # Reset root
-        self.root = MCTSNode()
-        
         legal_cols = get_legal_columns(state)
+        if not (self._reuse_root and self._legal[ROOT] == legal_cols):
+            self._reset_tree()
+        self._reuse_root = False
+        
         if not legal_cols:
             return 0, np.zeros(3)
         
@@ -318,72 +520,108 @@ class MCTS:
             policy = np.zeros(3)
             policy[legal_cols[0]] = 1.0
             return legal_cols[0], policy
-        
-        # Expand root
-        self.expand(self.root, state)
 
-        # Run batched simulations for MPS/GPU efficiency
-        root_player = state.current_player
-        remaining = self.simulations
-
-        while remaining > 0:
-            current_batch = min(remaining, self.batch_size)
-
-            # Collect paths and leaves for batch evaluation
-            paths = []
-            leaves = []  # (node, state, path_idx)
-            leaf_states = []
-
-            for i in range(current_batch):
-                path, leaf_node, leaf_state, terminal_value = self._select_path(
-                    state, root_player
-                )
-
-                if terminal_value is not None:
-                    # Terminal state - backpropagate immediately
-                    for node, _ in path:
-                        node.total_value += terminal_value
-                elif leaf_node is not None and leaf_state is not None:
-                    # Leaf needs expansion and evaluation
-                    self.expand(leaf_node, leaf_state)
-                    paths.append(path)
-                    leaves.append((leaf_node, leaf_state, len(paths) - 1))
-                    leaf_states.append(leaf_state)
-
-            # Batch evaluate all collected leaves
-            if leaf_states:
-                _, values = self.get_policy_value_batched(leaf_states)
-
-                # Backpropagate each path with its value
-                for idx, (leaf_node, leaf_state, path_idx) in enumerate(leaves):
-                    value = values[idx]
-                    # Adjust for perspective
-                    if leaf_state.current_player != root_player:
-                        value = -value
-                    for node, _ in paths[path_idx]:
-                        node.total_value += value
-
-            remaining -= current_batch
+        return None
 
+    def select_action(self) -> Tuple[int, np.ndarray]:
+        """Pick the move to play from root visit counts."""
         # Get visit counts
+        legal = self._legal[ROOT]
         visits = np.zeros(3)
-        for action, child in self.root.children.items():
-            visits[action] = child.visits
+        for action in legal:
+            visits[action] = self._visits[self._child_idx[ROOT * 3 + action]]
         
         # Select action based on temperature
         if self.temperature == 0:
             # Deterministic: pick highest visit count
-            action = max(self.root.children.keys(), key=lambda a: self.root.children[a].visits)
+            action = max(legal, key=lambda a: visits[a])
             policy = np.zeros(3)
             policy[action] = 1.0
         else:
             # Sample from visit distribution with temperature
             visits_temp = visits ** (1.0 / self.temperature)
             policy = visits_temp / visits_temp.sum()
-            action = np.random.choice(3, p=policy)
+            # Inverse-CDF sample; side="right" never lands on a zero-probability column
+            cdf = np.cumsum(policy)
+            action = int(np.searchsorted(cdf, random.random() * cdf[-1], side="right"))
         
         return action, policy
 
+    def search(self, state: GameState) -> Tuple[int, np.ndarray]:
+        """
+        Run MCTS search and return best action and visit distribution.
+        
+        Args:
+            state: Current game state
+            
+        Returns:
+            action: Best action to take
+            policy: Visit count distribution over actions (for training target)
+        """
+        forced = self.prepare_root(state)
+        if forced is not None:
+            return forced
+        
+        if self._legal[ROOT]:
+            # Kept subtree: its root priors came from whichever roll first
+            # reached it, so re-derive them for this state
+            policy, _ = self.get_policy_value(state)
+            priors = self._legal_priors(policy, self._legal[ROOT])
+            for action in self._legal[ROOT]:
+                self._priors[ROOT * 3 + action] = priors[action]
+        else:
+            self.expand(ROOT, state)
+
+        # Run batched simulations for MPS/GPU efficiency, counting visits a
+        # kept subtree already has toward the budget
+        root_player = state.current_player
+        batch_size = self.leaf_batch_size
+        remaining = self.simulations - self._visits[ROOT]
+        for start in range(0, remaining, batch_size):
+            self.simulate_batch(
+                state, root_player, min(batch_size, remaining - start)
+            )
+
+        return self.select_action()
+
+
+class _Trajectory:
+    """
+    Positions and search policies recorded during one self-play game.
+
+    Rows are written straight into preallocated arrays (doubled if a game
+    runs long), so a finished game comes out as three arrays rather than a
+    list of per-move tuples.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.states = np.empty((capacity, STATE_ENCODING_SIZE), dtype=np.float32)
+        self.policies = np.empty((capacity, 3), dtype=np.float32)
+        self.players = np.empty(capacity, dtype=np.int8)  # Player.value of each mover
+        self.n = 0
+
+    def record(self, state: GameState, policy: np.ndarray) -> None:
+        """Record the position about to be played and its search policy."""
+        t = self.n
+        if t == len(self.states):
+            self.states = np.concatenate([self.states, np.empty_like(self.states)])
+            self.policies = np.concatenate([self.policies, np.empty_like(self.policies)])
+            self.players = np.concatenate([self.players, np.empty_like(self.players)])
+        encode_state_into(state, self.states[t])
+        self.policies[t] = policy
+        self.players[t] = state.current_player.value
+        self.n = t + 1
+
+    def samples(self, final_state: GameState) -> Samples:
+        """Label the recorded positions with the final game result for each mover."""
+        t = self.n
+        values = np.where(
+            self.players[:t] == Player.PLAYER1.value,
+            np.float32(get_game_result(final_state, Player.PLAYER1)),
+            np.float32(get_game_result(final_state, Player.PLAYER2)),
+        )
+        return self.states[:t], self.policies[:t], values
+
 
 def self_play_game(
     network: Optional[PolicyValueNetwork] = None,
@@ -391,7 +629,7 @@ def self_play_game(
     temperature: float = 1.0,
     temperature_threshold: int = 15,  # Use temp=0 after this many moves
     inference_server: Optional["InferenceServer"] = None,
-) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+) -> Samples:
     """
     Play a complete game using MCTS self-play.
 
@@ -403,7 +641,9 @@ def self_play_game(
         inference_server: Optional shared inference server for parallel games
 
     Returns:
-        List of (state_features, policy_target, value_target) tuples
+        states: Array of shape (num_moves, 43)
+        policies: Array of shape (num_moves, 3), the MCTS policy targets
+        values: Array of shape (num_moves,), the result for each position's mover
     """
     state = GameState.new_game()
     mcts = MCTS(
@@ -413,7 +653,7 @@ def self_play_game(
         inference_server=inference_server,
     )
     
-    history: List[Tuple[np.ndarray, np.ndarray, Player]] = []
+    trajectory = _Trajectory()
     move_count = 0
     
     while state.phase != GamePhase.ENDED:
@@ -431,8 +671,7 @@ def self_play_game(
         action, policy = mcts.search(state)
         
         # Record state and policy
-        features = encode_state(state)
-        history.append((features, policy, state.current_player))
+        trajectory.record(state, policy)
         
         # Apply move
         new_state = apply_move(state, action)
@@ -441,21 +680,142 @@ def self_play_game(
         state = new_state
         move_count += 1
     
-    # Get game result and create training samples
-    samples = []
-    for features, policy, player in history:
-        value = get_game_result(state, player)
-        samples.append((features, policy, value))
+    return trajectory.samples(state)
+
+
+@dataclass
+class _LockstepGame:
+    """One game advanced by self_play_games_parallel."""
+    state: GameState
+    mcts: MCTS
+    trajectory: _Trajectory = field(default_factory=_Trajectory)
+    move_count: int = 0
+    done: bool = False
+
+
+def self_play_games_parallel(
+    n_games: int,
+    network: Optional[PolicyValueNetwork] = None,
+    simulations: int = DEFAULT_SIMULATIONS,
+    temperature: float = 1.0,
+    temperature_threshold: int = 15,
+    batch_size: int = 16,
+) -> List[Samples]:
+    """
+    Play several self-play games in lockstep with shared batched inference.
+
+    Every game searches its current move at the same time; root expansions
+    and each round of leaf evaluations from all games go through the network
+    in a single batched call, so the forward pass sees n_games * batch_size
+    states instead of one.
+
+    Args:
+        n_games: Number of games to play concurrently
+        network: Policy-value network (uses heuristic if None)
+        simulations: MCTS simulations per move
+        temperature: Temperature for action selection
+        temperature_threshold: Use temp=0 after this many moves
+        batch_size: Leaves collected per game per evaluation round
+
+    Returns:
+        One (states, policies, values) triple per game, as from self_play_game
+    """
+    # Each game's searcher only holds its tree; every evaluation goes
+    # through the shared evaluator below
+    games = [
+        _LockstepGame(
+            state=GameState.new_game(),
+            mcts=MCTS(
+                network=None,
+                simulations=simulations,
+                temperature=temperature,
+                batch_size=batch_size,
+            ),
+        )
+        for _ in range(n_games)
+    ]
+    # Batched evaluations for every game go through one dedicated evaluator.
+    # Its cache fills n_games times faster than a single game's, so it is sized
+    # to hold at least two lockstep moves' worth of evaluations; otherwise it
+    # would be reset several times per move and lose the reuse between moves.
+    evaluator = MCTS(
+        network=network,
+        simulations=simulations,
+        batch_size=batch_size,
+        eval_cache_size=max(EVAL_CACHE_SIZE, 2 * n_games * (simulations + 1)),
+    )
     
-    return samples
+    while True:
+        active = [g for g in games if not g.done]
+        if not active:
+            break
+
+        # Roll dice so every active game is waiting on a placement
+        for g in active:
+            if g.state.phase == GamePhase.ROLLING:
+                g.state = apply_roll(g.state, roll_die())
+
+        moves = {}
+        searching = []
+        for g in active:
+            g.mcts.temperature = temperature if g.move_count < temperature_threshold else 0.0
+            forced = g.mcts.prepare_root(g.state)
+            if forced is not None:
+                moves[id(g)] = forced
+            else:
+                searching.append(g)
+
+        if searching:
+            # Expand all roots with one batched evaluation
+            policies, _ = evaluator.get_policy_value_batched([g.state for g in searching])
+            for g, policy in zip(searching, policies):
+                g.mcts.expand(ROOT, g.state, policy)
+
+            # Run simulations for every game in lockstep
+            leaf_batch = evaluator.leaf_batch_size
+            for start in range(0, simulations, leaf_batch):
+                n = min(leaf_batch, simulations - start)
+                pending = [
+                    (g, g.mcts.collect_leaves(g.state, g.state.current_player, n))
+                    for g in searching
+                ]
+                leaf_states = [s for _, leaves in pending for _, s in leaves]
+                if not leaf_states:
+                    continue
+
+                policies, values = evaluator.get_policy_value_batched(leaf_states)
+                offset = 0
+                for g, leaves in pending:
+                    k = len(leaves)
+                    g.mcts.backup_leaves(
+                        leaves, g.state.current_player,
+                        policies[offset:offset + k], values[offset:offset + k],
+                    )
+                    offset += k
+
+            for g in searching:
+                moves[id(g)] = g.mcts.select_action()
+
+        # Record and apply each game's move
+        for g in active:
+            action, policy = moves[id(g)]
+            g.trajectory.record(g.state, policy)
+            new_state = apply_move(g.state, action)
+            if new_state is None:
+                g.done = True
+                continue
+            g.state = new_state
+            g.move_count += 1
+            g.done = g.state.phase == GamePhase.ENDED
+
+    return [g.trajectory.samples(g.state) for g in games]
 
 
 if __name__ == "__main__":
     # Test self-play
     print("Running self-play game without network...")
-    samples = self_play_game(network=None, simulations=100)
-    print(f"Generated {len(samples)} training samples")
+    states, policies, values = self_play_game(network=None, simulations=100)
+    print(f"Generated {len(states)} training samples")
     
-    if samples:
-        features, policy, value = samples[0]
-        print(f"First sample - Features shape: {features.shape}, Policy: {policy}, Value: {value}")
+    if len(states):
+        print(f"First sample - Features shape: {states[0].shape}, Policy: {policies[0]}, Value: {values[0]}")
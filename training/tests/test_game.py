@@ -0,0 +1,66 @@
+"""Tests for GameState score tracking."""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from game import (
+    GamePhase, GameState, Player,
+    apply_move, apply_roll, calculate_grid_score, evaluate_state, get_winner,
+)
+
+
+def _state_from_grids(grid1, grid2, phase=GamePhase.ENDED) -> GameState:
+    """A state built directly from grids, without passing scores."""
+    return GameState(
+        grid1=np.array(grid1, dtype=np.int8),
+        grid2=np.array(grid2, dtype=np.int8),
+        current_player=Player.PLAYER1,
+        current_die=None,
+        phase=phase,
+    )
+
+
+class ScoreTrackingTest(unittest.TestCase):
+    def test_scores_computed_from_populated_grids(self):
+        state = _state_from_grids(
+            [[6, 6, 6], [5, 4, 3], [2, 1, 1]],
+            [[1, 2, 3], [1, 0, 0], [0, 0, 0]],
+        )
+        self.assertEqual(state.score1, calculate_grid_score(state.grid1))
+        self.assertEqual(state.score2, calculate_grid_score(state.grid2))
+        self.assertEqual(get_winner(state), Player.PLAYER1)
+        self.assertGreater(evaluate_state(state, Player.PLAYER1), 0)
+        self.assertLess(evaluate_state(state, Player.PLAYER2), 0)
+
+    def test_player2_ahead_on_populated_grids(self):
+        state = _state_from_grids(
+            [[1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[6, 6, 0], [5, 5, 0], [4, 0, 0]],
+        )
+        self.assertEqual(get_winner(state), Player.PLAYER2)
+
+    def test_apply_move_keeps_scores_consistent(self):
+        state = _state_from_grids(
+            [[3, 3, 0], [2, 0, 0], [0, 0, 0]],
+            [[4, 4, 0], [1, 0, 0], [6, 0, 0]],
+            phase=GamePhase.ROLLING,
+        )
+        for die, col in ((4, 0), (3, 0), (6, 2), (1, 1)):
+            state = apply_move(apply_roll(state, die), col)
+            self.assertEqual(state.score1, calculate_grid_score(state.grid1))
+            self.assertEqual(state.score2, calculate_grid_score(state.grid2))
+
+    def test_explicit_scores_are_kept(self):
+        state = GameState.new_game()
+        self.assertEqual((state.score1, state.score2), (0, 0))
+        copied = _state_from_grids([[2, 0, 0]] * 3, [[0, 0, 0]] * 3).copy()
+        self.assertEqual(copied.score1, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
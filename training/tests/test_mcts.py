@@ -0,0 +1,68 @@
+"""Tests for MCTS network evaluation caching."""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import mcts
+from game import GameState, apply_move, apply_roll, get_legal_columns
+from mcts import MCTS
+from network import create_network
+
+
+def _distinct_states(n: int):
+    """n distinct mid-game states, reached by always playing the first legal column."""
+    states = []
+    state = apply_roll(GameState.new_game(), 1)
+    die = 1
+    while len(states) < n:
+        states.append(state)
+        state = apply_move(state, get_legal_columns(state)[0])
+        die = die % 6 + 1
+        state = apply_roll(state, die)
+    return states
+
+
+class EvalCacheTest(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.network = create_network()
+
+    def test_batched_eval_survives_cache_reset(self):
+        states = _distinct_states(6)
+        tree = MCTS(network=self.network, simulations=10, eval_cache_size=4)
+        # Fill the cache with the first three states, then ask for a batch
+        # that mixes those hits with enough misses to force a reset
+        tree.get_policy_value_batched(states[:3])
+        policies, values = tree.get_policy_value_batched(states)
+
+        expected_policies, expected_values = MCTS(
+            network=self.network, simulations=10
+        )._evaluate_batch(states)
+        np.testing.assert_allclose(policies, expected_policies, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(values, expected_values, rtol=1e-5, atol=1e-6)
+
+    def test_batched_eval_repeats_states_within_batch(self):
+        states = _distinct_states(3)
+        tree = MCTS(network=self.network, simulations=10)
+        policies, _ = tree.get_policy_value_batched(states + states)
+        np.testing.assert_array_equal(policies[:3], policies[3:])
+
+    def test_lockstep_self_play_with_small_cache(self):
+        with mock.patch.object(mcts, "EVAL_CACHE_SIZE", 1):
+            games = mcts.self_play_games_parallel(3, network=self.network, simulations=8)
+        self.assertEqual(len(games), 3)
+        for states, policies, values in games:
+            self.assertGreater(len(states), 0)
+            self.assertEqual(len(states), len(policies))
+            self.assertEqual(len(states), len(values))
+
+
+if __name__ == "__main__":
+    unittest.main()
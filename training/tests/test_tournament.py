@@ -0,0 +1,39 @@
+"""Tests for tournament early stopping."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tournament import _collect_outcomes, sprt_decided
+
+WIN1 = (1, 0, 0)
+WIN2 = (2, 0, 0)
+
+
+class CollectOutcomesTest(unittest.TestCase):
+    def test_sprt_sees_games_in_index_order(self):
+        # Agent2's wins finish first, but agent1 won the earlier-indexed games
+        wins1 = [(i, WIN1) for i in range(10)]
+        wins2 = [(i, WIN2) for i in range(10, 40)]
+        outcomes = _collect_outcomes(wins2 + wins1, sprt=True)
+        self.assertEqual(outcomes[:10], [WIN1] * 10)
+        self.assertTrue(all(outcome == WIN2 for outcome in outcomes[10:]))
+
+    def test_stops_at_first_decided_prefix(self):
+        results = [(i, WIN1) for i in reversed(range(100))]
+        outcomes = _collect_outcomes(results, sprt=True)
+        n = len(outcomes)
+        self.assertLess(n, 100)
+        self.assertTrue(sprt_decided(n, 0))
+        self.assertFalse(sprt_decided(n - 1, 0))
+
+    def test_without_sprt_keeps_every_game(self):
+        results = [(i, WIN1 if i % 2 else WIN2) for i in reversed(range(50))]
+        outcomes = _collect_outcomes(results, sprt=False)
+        self.assertEqual(outcomes, [WIN2 if i % 2 == 0 else WIN1 for i in range(50)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,24 +8,40 @@ Produces win rates and estimated Elo ratings.
 
 import argparse
 import json
+import math
 import os
 import random
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import torch
 from tqdm import tqdm
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from game import (
     GameState, Player, GamePhase,
-    get_legal_columns, apply_move, apply_roll, roll_die,
-    encode_state, evaluate_state, get_game_result, calculate_grid_score
+    get_legal_columns, apply_move, apply_roll, roll_die, seed_rolls,
+    encode_state, evaluate_state, get_game_result,
+    grid_column_keys, column_move_gain,
+    COL_SCORE, COL_FULL, COL_EMPTY_ROW, COL_COMPACT
 )
+from game_fast import NUMBA_AVAILABLE
+from inference_server import InferenceServer
 from mcts import MCTS
 from network import PolicyValueNetwork, create_network
 
+if NUMBA_AVAILABLE:
+    from game_fast import greedy_best_col
+
 
 class AgentType(Enum):
     RANDOM = "random"
@@ -34,6 +50,29 @@ class AgentType(Enum):
     MCTS_NEURAL = "mcts_neural"
 
 
+# Agents whose moves batched_play can make for many games at once
+BATCHABLE_AGENTS = (AgentType.RANDOM, AgentType.GREEDY)
+
+# Rolls pre-drawn for a seeded game; games average about 21 and rarely pass 35
+GAME_DICE = 48
+
+# Sequential probability ratio test for stopping a tournament early:
+# H0 "agent1 is 50 Elo weaker" vs H1 "agent1 is 50 Elo stronger"
+SPRT_ELO0 = -50.0
+SPRT_ELO1 = 50.0
+SPRT_ALPHA = 0.05  # False positive rate
+SPRT_BETA = 0.05  # False negative rate
+
+
+# Move method for each agent type, bound once per agent
+_MOVE_METHODS = {
+    AgentType.RANDOM: "_random_move",
+    AgentType.GREEDY: "_greedy_move",
+    AgentType.MCTS_HEURISTIC: "_mcts_move",
+    AgentType.MCTS_NEURAL: "_mcts_move",
+}
+
+
 @dataclass
 class Agent:
     """Represents an AI agent."""
@@ -41,6 +80,25 @@ class Agent:
     agent_type: AgentType
     network: Optional[PolicyValueNetwork] = None
     simulations: int = 200
+    inference_server: Optional[InferenceServer] = None  # Shared batched evaluation for MCTS_NEURAL
+    
+    def __post_init__(self) -> None:
+        # Resolve the move method once rather than branching on every move
+        self._move_fn = getattr(self, _MOVE_METHODS[self.agent_type])
+        # MCTS searchers are built on first use and kept. Threaded tournaments
+        # share one agent across games, and an MCTS instance is single-threaded,
+        # so each thread gets its own.
+        self._local = threading.local()
+    
+    def __getstate__(self) -> Dict:
+        # Bound methods and searchers are rebuilt rather than pickled to workers
+        state = self.__dict__.copy()
+        del state["_move_fn"], state["_local"]
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self.__post_init__()
     
     def get_move(self, state: GameState) -> int:
         """Get the agent's move for the current state."""
@@ -49,67 +107,121 @@ class Agent:
             return 0
         if len(legal_cols) == 1:
             return legal_cols[0]
+        return self._move_fn(state, legal_cols)
+    
+    def _random_move(self, state: GameState, legal_cols: List[int]) -> int:
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            rng = self._local.rng = random.Random()
+        return rng.choice(legal_cols)
+    
+    def _greedy_move(self, state: GameState, legal_cols: List[int]) -> int:
+        if state.current_player == Player.PLAYER1:
+            my_grid, opp_grid = state.grid1, state.grid2
+        else:
+            my_grid, opp_grid = state.grid2, state.grid1
         
-        if self.agent_type == AgentType.RANDOM:
-            return random.choice(legal_cols)
+        if NUMBA_AVAILABLE:
+            # Same choice as below, in one compiled call
+            return int(greedy_best_col(my_grid, opp_grid, state.current_die))
         
-        elif self.agent_type == AgentType.GREEDY:
-            # Pick move with best immediate score gain
-            best_col = legal_cols[0]
-            best_score = float("-inf")
-            
-            for col in legal_cols:
-                new_state = apply_move(state, col)
-                if new_state is None:
-                    continue
-                
-                # Evaluate from current player's perspective
-                if state.current_player == Player.PLAYER1:
-                    score = calculate_grid_score(new_state.grid1) - calculate_grid_score(state.grid1)
-                    opp_loss = calculate_grid_score(state.grid2) - calculate_grid_score(new_state.grid2)
-                else:
-                    score = calculate_grid_score(new_state.grid2) - calculate_grid_score(state.grid2)
-                    opp_loss = calculate_grid_score(state.grid1) - calculate_grid_score(new_state.grid1)
-                
-                total_score = score + opp_loss
-                if total_score > best_score:
-                    best_score = total_score
-                    best_col = col
-            
-            return best_col
+        # Pick move with best immediate score gain. legal_cols already
+        # rules out full columns, so score each candidate straight from
+        # its column keys instead of building the resulting state
+        my_keys = grid_column_keys(my_grid)
+        opp_keys = grid_column_keys(opp_grid)
+        die_value = state.current_die
         
-        elif self.agent_type == AgentType.MCTS_HEURISTIC:
-            mcts = MCTS(network=None, simulations=self.simulations, temperature=0)
-            action, _ = mcts.search(state)
-            return action
+        best_col = legal_cols[0]
+        best_score = float("-inf")
+        for col in legal_cols:
+            total_score = column_move_gain(my_keys[col], opp_keys[col], die_value)
+            if total_score > best_score:
+                best_score = total_score
+                best_col = col
         
-        elif self.agent_type == AgentType.MCTS_NEURAL:
-            if self.network is None:
-                # Fall back to heuristic MCTS
-                mcts = MCTS(network=None, simulations=self.simulations, temperature=0)
+        return best_col
+    
+    def _mcts_move(self, state: GameState, legal_cols: List[int]) -> int:
+        mcts = getattr(self._local, "mcts", None)
+        if mcts is None:
+            if self.agent_type == AgentType.MCTS_NEURAL and self.network is not None:
+                mcts = MCTS(
+                    network=self.network,
+                    simulations=self.simulations,
+                    temperature=0,
+                    inference_server=self.inference_server,
+                )
             else:
-                mcts = MCTS(network=self.network, simulations=self.simulations, temperature=0)
-            action, _ = mcts.search(state)
-            return action
+                # Heuristic MCTS, also the fallback for a neural agent without a network
+                mcts = MCTS(network=None, simulations=self.simulations, temperature=0)
+            self._local.mcts = mcts
+        
+        # Continue from last move's tree, two plies down, if the game followed it
+        last_action = getattr(self._local, "last_action", None)
+        if last_action is not None:
+            opp_action = _opponent_move(self._local.after_move, state)
+            if opp_action is not None:
+                mcts.advance_root([last_action, opp_action])
         
-        return legal_cols[0]
+        action, _ = mcts.search(state)
+        self._local.last_action = action
+        self._local.after_move = apply_move(state, action)
+        return action
+    
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Forget the calling thread's game in progress; call before each new game.
+        
+        Args:
+            seed: Reseeds this thread's move choices (None keeps the current stream)
+        """
+        self._local.last_action = None
+        if seed is not None:
+            self._local.rng = random.Random(seed)
+
 
+def _opponent_move(after_move: GameState, state: GameState) -> Optional[int]:
+    """Find the column the opponent played between after_move and state, if any."""
+    if after_move is None or after_move.phase != GamePhase.ROLLING:
+        return None
+    for die_value in range(1, 7):
+        rolled = apply_roll(after_move, die_value)
+        for col in get_legal_columns(rolled):
+            played = apply_move(rolled, col)
+            if (
+                played.current_player == state.current_player
+                and np.array_equal(played.grid1, state.grid1)
+                and np.array_equal(played.grid2, state.grid2)
+            ):
+                return col
+    return None
 
-def play_game(agent1: Agent, agent2: Agent) -> Tuple[Optional[Player], int, int]:
+
+def play_game(
+    agent1: Agent, agent2: Agent, dice: Sequence[int] = ()
+) -> Tuple[Optional[Player], int, int]:
     """
     Play a game between two agents.
     
+    Args:
+        dice: Rolls to use in order; once they run out, roll_die takes over
+    
     Returns:
         winner: Player.PLAYER1, Player.PLAYER2, or None for tie
         score1: Final score for player 1
         score2: Final score for player 2
     """
     state = GameState.new_game()
+    turn = 0
+    agent1.reset()
+    agent2.reset()
     
     while state.phase != GamePhase.ENDED:
         # Roll die if needed
         if state.phase == GamePhase.ROLLING:
-            die_value = roll_die()
+            die_value = dice[turn] if turn < len(dice) else roll_die()
+            turn += 1
             state = apply_roll(state, die_value)
             continue
         
@@ -123,8 +235,7 @@ def play_game(agent1: Agent, agent2: Agent) -> Tuple[Optional[Player], int, int]
             break
         state = new_state
     
-    score1 = calculate_grid_score(state.grid1)
-    score2 = calculate_grid_score(state.grid2)
+    score1, score2 = state.score1, state.score2
     
     if score1 > score2:
         winner = Player.PLAYER1
@@ -136,56 +247,293 @@ def play_game(agent1: Agent, agent2: Agent) -> Tuple[Optional[Player], int, int]
     return winner, score1, score2
 
 
+def batched_play(
+    agent1: Agent, agent2: Agent, n_games: int, rng: Optional[np.random.Generator] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Play n_games between two RANDOM/GREEDY agents at once.
+    
+    Games are held as arrays of column keys (see game.column_key), shaped
+    (n_games, 2 players, 3 columns), and each turn is a handful of table
+    lookups across every unfinished game rather than a Python loop per game.
+    Players alternate in lockstep, so all live games share the player to move.
+    
+    Returns:
+        winners: 1 for player 1, 2 for player 2, 0 for a tie, per game
+        score1: Final scores for player 1
+        score2: Final scores for player 2
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    agents = (agent1, agent2)
+    keys = np.zeros((n_games, 2, 3), dtype=np.int16)
+    live = np.arange(n_games)
+    player = 0
+    
+    while live.size:
+        n = live.size
+        rows = np.arange(n)
+        my = keys[live, player]
+        opp = keys[live, 1 - player]
+        dice = rng.integers(1, 7, size=n)[:, None]
+        
+        # Candidate keys for placing the die in each column
+        empty_row = COL_EMPTY_ROW[my]
+        legal = empty_row >= 0
+        placed = np.where(legal, my + (dice << (3 * np.maximum(empty_row, 0))), my)
+        compacted = COL_COMPACT[dice, opp]
+        
+        if agents[player].agent_type == AgentType.GREEDY:
+            # Only the chosen column changes, so compare per-column gains
+            gain = (COL_SCORE[placed] - COL_SCORE[my]) + (COL_SCORE[opp] - COL_SCORE[compacted])
+        else:
+            # Uniform over legal columns: argmax of independent uniforms
+            gain = rng.random((n, 3))
+        # argmax takes the first maximum, matching Greedy's lowest-column tie-break
+        col = np.where(legal, gain, -np.inf).argmax(axis=1)
+        
+        my[rows, col] = placed[rows, col]
+        opp[rows, col] = compacted[rows, col]
+        keys[live, player] = my
+        keys[live, 1 - player] = opp
+        
+        live = live[~COL_FULL[my].all(axis=1)]
+        player = 1 - player
+    
+    scores = COL_SCORE[keys].sum(axis=2)
+    score1, score2 = scores[:, 0], scores[:, 1]
+    winners = np.where(score1 > score2, 1, np.where(score2 > score1, 2, 0))
+    return winners, score1, score2
+
+
+def _play_batched_tournament(
+    agent1: Agent, agent2: Agent, num_games: int, seed: Optional[int]
+) -> np.ndarray:
+    """Tournament outcome rows via batched_play, with agent1 first in even games."""
+    rng = np.random.default_rng(seed)
+    outcomes = np.empty((num_games, 3), dtype=np.int64)
+    outcomes[0::2] = np.column_stack(batched_play(agent1, agent2, (num_games + 1) // 2, rng))
+    # agent1 plays as player 2 in odd games, so swap winners and scores back
+    winners, s2, s1 = batched_play(agent2, agent1, num_games // 2, rng)
+    outcomes[1::2] = np.column_stack((np.array([0, 2, 1])[winners], s1, s2))
+    return outcomes
+
+
+def _play_tournament_game(
+    agent1: Agent, agent2: Agent, index: int, seed: Optional[int]
+) -> Tuple[int, int, int]:
+    """
+    Play game number index of a tournament, alternating who moves first.
+
+    Returns:
+        outcome: 1 if agent1 won, 2 if agent2 won, 0 for a tie
+        score1: agent1's final score
+        score2: agent2's final score
+    """
+    dice: Sequence[int] = ()
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed % 2**32)
+        # Only MCTS rollouts draw from this; seeding it doesn't fill the buffer
+        seed_rolls(seed)
+        # The game's own dice come from a separate stream, drawn in one call
+        # rather than through a whole freshly seeded roll buffer
+        dice = np.random.default_rng([seed, 1]).integers(1, 7, size=GAME_DICE).tolist()
+        # Each agent draws its own moves, independently of the other
+        agent_seeds = random.Random(seed)
+        agent1.reset(agent_seeds.getrandbits(64))
+        agent2.reset(agent_seeds.getrandbits(64))
+
+    if index % 2 == 0:
+        winner, s1, s2 = play_game(agent1, agent2, dice)
+        agent1_player = Player.PLAYER1
+    else:
+        # agent1 plays as player 2
+        winner, s2, s1 = play_game(agent2, agent1, dice)
+        agent1_player = Player.PLAYER2
+
+    if winner is None:
+        return 0, s1, s2
+    return (1 if winner == agent1_player else 2), s1, s2
+
+
+def sprt_decided(
+    wins1: int,
+    wins2: int,
+    elo0: float = SPRT_ELO0,
+    elo1: float = SPRT_ELO1,
+    alpha: float = SPRT_ALPHA,
+    beta: float = SPRT_BETA,
+) -> bool:
+    """
+    Check whether a sequential probability ratio test has settled the matchup.
+    
+    Compares H0 (agent1 is elo0 Elo stronger) against H1 (elo1 stronger)
+    using decisive games; ties carry no evidence in this model. Returns True
+    once the log-likelihood ratio leaves (log(beta / (1 - alpha)),
+    log((1 - beta) / alpha)), i.e. one hypothesis is accepted.
+    """
+    p0 = 1 / (1 + 10 ** (-elo0 / 400))
+    p1 = 1 / (1 + 10 ** (-elo1 / 400))
+    llr = wins1 * math.log(p1 / p0) + wins2 * math.log((1 - p1) / (1 - p0))
+    return not math.log(beta / (1 - alpha)) < llr < math.log((1 - beta) / alpha)
+
+
+def _collect_outcomes(
+    results: Iterable[Tuple[int, Tuple[int, int, int]]], sprt: bool
+) -> List[Tuple[int, int, int]]:
+    """
+    Gather (game index, outcome) pairs, stopping as soon as SPRT decides if enabled.
+    
+    Pairs may arrive in any order, but outcomes are taken in game-index order:
+    only the contiguous prefix of finished games is fed to the test. How soon
+    a game finishes depends on its length, which correlates with who wins,
+    so stopping on completion order would bias the sample.
+    """
+    finished = {}
+    outcomes = []
+    counts = [0, 0, 0]  # ties, agent1 wins, agent2 wins
+    for index, outcome in results:
+        finished[index] = outcome
+        while len(outcomes) in finished:
+            outcome = finished.pop(len(outcomes))
+            outcomes.append(outcome)
+            counts[outcome[0]] += 1
+            if sprt and sprt_decided(counts[1], counts[2]):
+                return outcomes
+    return outcomes
+
+
+# Agents held by each tournament worker process, set once by its initializer
+_worker_agents: Optional[Tuple[Agent, Agent]] = None
+
+
+def _init_tournament_worker(agent1: Agent, agent2: Agent) -> None:
+    """Process pool initializer: keep the agents so tasks don't re-pickle them."""
+    global _worker_agents
+    # One game per process already fills the cores; avoid BLAS oversubscription
+    torch.set_num_threads(1)
+    _worker_agents = (agent1, agent2)
+
+
+def _play_tournament_game_in_worker(args: Tuple[int, Optional[int]]) -> Tuple[int, int, int]:
+    """Worker function for parallel tournaments."""
+    index, seed = args
+    return _play_tournament_game(*_worker_agents, index, seed)
+
+
 def run_tournament(
     agent1: Agent,
     agent2: Agent,
     num_games: int = 100,
     show_progress: bool = True,
+    num_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    batch_inference: bool = False,
+    sprt: bool = False,
 ) -> Dict:
     """
     Run a tournament between two agents.
     
     Each agent plays as both player 1 and player 2 for fairness.
+    Games are independent, so they are spread across worker processes;
+    Random and Greedy matchups are instead vectorized with batched_play.
+    
+    With batch_inference, network agents instead play num_workers games at
+    once on threads, and a shared InferenceServer per network merges their
+    leaf evaluations into one forward pass.
+    
+    Args:
+        num_workers: Worker processes or threads (defaults to CPU count; 1 plays in-process)
+        seed: Base seed; game i is seeded with seed + i for reproducibility
+            (batch_inference runs can still differ in float rounding, since
+            evaluations depend on how concurrent requests are batched)
+        batch_inference: Batch network evaluations across concurrent games
+        sprt: Stop once a sequential probability ratio test decides which agent
+            is stronger (see sprt_decided); total_games reports games played.
+            The test is applied to games in index order, whatever order
+            they finish in.
+            Batched Random/Greedy matchups always play every game, since
+            they finish all at once.
     
     Returns:
         Dictionary with results
     """
-    wins1 = 0
-    wins2 = 0
-    ties = 0
-    scores1 = []
-    scores2 = []
-    
-    games_iter = range(num_games)
-    if show_progress:
-        games_iter = tqdm(games_iter, desc=f"{agent1.name} vs {agent2.name}")
-    
-    for i in games_iter:
-        # Alternate who plays as player 1
-        if i % 2 == 0:
-            a1, a2 = agent1, agent2
-            winner, s1, s2 = play_game(a1, a2)
-            scores1.append(s1)
-            scores2.append(s2)
-            
-            if winner == Player.PLAYER1:
-                wins1 += 1
-            elif winner == Player.PLAYER2:
-                wins2 += 1
-            else:
-                ties += 1
-        else:
-            a1, a2 = agent2, agent1
-            winner, s1, s2 = play_game(a1, a2)
-            scores1.append(s2)  # agent1 played as player 2
-            scores2.append(s1)
-            
-            if winner == Player.PLAYER2:
-                wins1 += 1
-            elif winner == Player.PLAYER1:
-                wins2 += 1
-            else:
-                ties += 1
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, num_games))
+    
+    desc = f"{agent1.name} vs {agent2.name}"
+    jobs = [(i, None if seed is None else seed + i) for i in range(num_games)]
+    
+    networks = [
+        a.network for a in (agent1, agent2)
+        if a.agent_type == AgentType.MCTS_NEURAL and a.network is not None
+    ]
+    
+    if agent1.agent_type in BATCHABLE_AGENTS and agent2.agent_type in BATCHABLE_AGENTS:
+        # Cheap agents: play every game at once in-process
+        outcomes = _play_batched_tournament(agent1, agent2, num_games, seed)
+    elif batch_inference and networks and num_workers > 1:
+        # One server per distinct network; both agents may share one
+        servers = {}
+        for network in networks:
+            if id(network) not in servers:
+                servers[id(network)] = InferenceServer(network, batch_size=64, max_wait_ms=2.0)
+        
+        def with_server(agent: Agent) -> Agent:
+            if agent.agent_type != AgentType.MCTS_NEURAL or agent.network is None:
+                return agent
+            return replace(agent, inference_server=servers[id(agent.network)])
+        
+        threaded1, threaded2 = with_server(agent1), with_server(agent2)
+        for server in servers.values():
+            server.start()
+        try:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = {
+                    executor.submit(_play_tournament_game, threaded1, threaded2, i, job_seed): i
+                    for i, job_seed in jobs
+                }
+                with tqdm(
+                    as_completed(futures), total=num_games, desc=desc, disable=not show_progress
+                ) as games_iter:
+                    outcomes = _collect_outcomes(
+                        ((futures[future], future.result()) for future in games_iter), sprt
+                    )
+                for future in futures:
+                    future.cancel()
+        finally:
+            for server in servers.values():
+                server.stop()
+    elif num_workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_tournament_worker,
+            initargs=(agent1, agent2),
+        ) as executor:
+            futures = {
+                executor.submit(_play_tournament_game_in_worker, job): job[0] for job in jobs
+            }
+            with tqdm(
+                as_completed(futures), total=num_games, desc=desc, disable=not show_progress
+            ) as games_iter:
+                outcomes = _collect_outcomes(
+                    ((futures[future], future.result()) for future in games_iter), sprt
+                )
+            for future in futures:
+                future.cancel()
+    else:
+        with tqdm(jobs, desc=desc, disable=not show_progress) as games_iter:
+            outcomes = _collect_outcomes(
+                ((i, _play_tournament_game(agent1, agent2, i, job_seed)) for i, job_seed in games_iter),
+                sprt,
+            )
+    
+    # One (outcome, score1, score2) row per game, reduced in one pass
+    outcomes = np.asarray(outcomes, dtype=np.int64).reshape(-1, 3)
+    ties, wins1, wins2 = np.bincount(outcomes[:, 0], minlength=3).tolist()
+    scores1, scores2 = outcomes[:, 1], outcomes[:, 2]
     
     total_games = wins1 + wins2 + ties
     winrate1 = wins1 / total_games if total_games > 0 else 0.5
@@ -193,11 +541,10 @@ def run_tournament(
     # Estimate Elo difference from winrate
     # Elo formula: expected = 1 / (1 + 10^((rating2 - rating1) / 400))
     # Rearranging: rating_diff = 400 * log10((1 - winrate) / winrate)
-    if 0 < winrate1 < 1:
-        elo_diff = 400 * np.log10((1 - winrate1) / winrate1)
-        elo_diff = -elo_diff  # Make positive mean agent1 is stronger
-    else:
-        elo_diff = 400 if winrate1 >= 1 else -400
+    # Ties count as half a win, and one extra drawn game keeps the estimate
+    # finite (rather than clamped) at 0% and 100% winrates
+    smoothed = (wins1 + 0.5 * ties + 0.5) / (total_games + 1)
+    elo_diff = -400 * math.log10((1 - smoothed) / smoothed)  # Positive means agent1 is stronger
     
     return {
         "agent1": agent1.name,
@@ -208,11 +555,39 @@ def run_tournament(
         "total_games": total_games,
         "winrate1": winrate1,
         "elo_difference": elo_diff,
-        "avg_score1": np.mean(scores1),
-        "avg_score2": np.mean(scores2),
+        "avg_score1": scores1.mean(),
+        "avg_score2": scores2.mean(),
     }
 
 
+def solve_elo_ratings(
+    all_results: List[Dict], anchor: str = "Random", anchor_rating: float = 1000.0
+) -> Dict[str, float]:
+    """
+    Fit one rating per agent to every matchup's Elo difference at once.
+    
+    Each tournament contributes a row rating[agent1] - rating[agent2] =
+    elo_difference; the least-squares solution is then shifted so anchor
+    sits at anchor_rating. Unlike chaining differences outward from the
+    anchor, this uses every matchup and doesn't depend on their order.
+    """
+    names = list(dict.fromkeys(
+        name for results in all_results for name in (results["agent1"], results["agent2"])
+    ))
+    index = {name: i for i, name in enumerate(names)}
+    
+    a = np.zeros((len(all_results), len(names)))
+    b = np.array([results["elo_difference"] for results in all_results], dtype=float)
+    for row, results in enumerate(all_results):
+        a[row, index[results["agent1"]]] = 1.0
+        a[row, index[results["agent2"]]] = -1.0
+    
+    # Differences only fix ratings up to a constant; lstsq picks the minimum-norm one
+    ratings = np.linalg.lstsq(a, b, rcond=None)[0]
+    ratings += anchor_rating - ratings[index[anchor]]
+    return {name: float(rating) for name, rating in zip(names, ratings)}
+
+
 def print_results(results: Dict) -> None:
     """Print tournament results."""
     print(f"\n{'='*50}")
@@ -230,8 +605,15 @@ def main():
     parser = argparse.ArgumentParser(description="Run AI tournament")
     parser.add_argument("--games", type=int, default=100, help="Number of games per matchup")
     parser.add_argument("--simulations", type=int, default=200, help="MCTS simulations per move")
-    parser.add_argument("--weights", type=str, default=None, help="Path to neural network weights")
+    parser.add_argument("--weights", type=str, default=None, help="Path to neural network weights (JSON or raw float32 .bin)")
     parser.add_argument("--output", type=str, default=None, help="Output JSON file for results")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes per matchup (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None, help="Base random seed for reproducible games")
+    parser.add_argument("--batch-inference", action="store_true",
+                        help="Run neural agents' games on threads sharing a batched inference server (for GPU networks)")
+    parser.add_argument("--sprt", action=argparse.BooleanOptionalAction, default=True,
+                        help="Stop a matchup early once a sequential probability ratio test decides it")
     
     args = parser.parse_args()
     
@@ -245,10 +627,22 @@ def main():
     # Add neural agent if weights provided
     if args.weights:
         network = create_network()
-        with open(args.weights, "r") as f:
-            weights = np.array(json.load(f))
+        if args.weights.endswith(".bin"):
+            # Raw little-endian float32, as written by train.py's export_weights
+            weights = np.fromfile(args.weights, dtype="<f4")
+        else:
+            with open(args.weights, "rb") as f:
+                data = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
+            # Converted straight to float32, which load_weights_from_array takes as is
+            weights = np.asarray(data, dtype=np.float32)
         if network.load_weights_from_array(weights):
             print(f"Loaded neural network weights from {args.weights}")
+            # Worker processes map these pages rather than receiving their own copy
+            network.share_memory()
+            if args.batch_inference and torch.cuda.is_available():
+                # The batched server evaluates on the GPU; games stay on threads
+                network.to("cuda")
+                print("  (batched inference on CUDA GPU)")
             agents.append(Agent(f"MCTS-Neural-{args.simulations}", AgentType.MCTS_NEURAL, 
                                network=network, simulations=args.simulations))
         else:
@@ -259,7 +653,12 @@ def main():
     
     for i, agent1 in enumerate(agents):
         for agent2 in agents[i+1:]:
-            results = run_tournament(agent1, agent2, num_games=args.games)
+            results = run_tournament(
+                agent1, agent2, num_games=args.games,
+                num_workers=args.workers, seed=args.seed,
+                batch_inference=args.batch_inference,
+                sprt=args.sprt,
+            )
             print_results(results)
             all_results.append(results)
     
@@ -268,22 +667,7 @@ def main():
     print("Estimated Elo Ratings (Random = 1000)")
     print(f"{'='*50}")
     
-    # Simple estimation: set Random to 1000 and calculate others from winrates
-    elo_ratings = {"Random": 1000}
-    
-    for results in all_results:
-        if results["agent1"] == "Random":
-            elo_ratings[results["agent2"]] = 1000 - results["elo_difference"]
-        elif results["agent2"] == "Random":
-            elo_ratings[results["agent1"]] = 1000 + results["elo_difference"]
-    
-    # Fill in remaining from transitive relationships
-    for results in all_results:
-        a1, a2 = results["agent1"], results["agent2"]
-        if a1 in elo_ratings and a2 not in elo_ratings:
-            elo_ratings[a2] = elo_ratings[a1] - results["elo_difference"]
-        elif a2 in elo_ratings and a1 not in elo_ratings:
-            elo_ratings[a1] = elo_ratings[a2] + results["elo_difference"]
+    elo_ratings = solve_elo_ratings(all_results, anchor="Random", anchor_rating=1000)
     
     # Sort and print
     sorted_agents = sorted(elo_ratings.items(), key=lambda x: x[1], reverse=True)
@@ -296,8 +680,13 @@ def main():
             "tournaments": all_results,
             "elo_ratings": elo_ratings,
         }
-        with open(args.output, "w") as f:
-            json.dump(output_data, f, indent=2)
+        if ORJSON_AVAILABLE:
+            # OPT_SERIALIZE_NUMPY covers numpy scalars such as the average scores
+            with open(args.output, "wb") as f:
+                f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(args.output, "w") as f:
+                json.dump(output_data, f, indent=2)
         print(f"\nResults saved to {args.output}")
 
 
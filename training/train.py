@@ -14,16 +14,17 @@ import argparse
 import json
 import os
 import time
+from collections import deque
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from multiprocessing import cpu_count
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 
 import numpy as np
 import torch
-import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data import DataLoader, RandomSampler, TensorDataset
 from tqdm import tqdm
 
 try:
@@ -34,8 +35,8 @@ except ImportError:
 
 from game import GameState, Player, get_game_result
 from inference_server import InferenceServer
-from mcts import self_play_game
-from network import PolicyValueNetwork, create_network
+from mcts import Samples, self_play_game, self_play_games_parallel
+from network import PolicyValueNetwork, create_network, STATE_ENCODING_SIZE, POLICY_OUTPUT_SIZE
 
 
 def get_device() -> torch.device:
@@ -48,7 +49,17 @@ def get_device() -> torch.device:
         return torch.device("cpu")
 
 
-def _play_single_game(args: Tuple[int, int, float]) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+def _init_self_play_worker() -> None:
+    """Process pool initializer: keep each self-play worker to one torch thread."""
+    # Workers already fill the cores; torch's own thread pools would oversubscribe them
+    torch.set_num_threads(1)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed if the parent ran inter-op work before forking
+
+
+def _play_single_game(args: Tuple[int, int, float]) -> Samples:
     """Worker function for parallel self-play (no network, uses heuristic)."""
     simulations_per_move, temperature, _ = args
     return self_play_game(
@@ -58,9 +69,7 @@ def _play_single_game(args: Tuple[int, int, float]) -> List[Tuple[np.ndarray, np
     )
 
 
-def _play_single_game_with_server(
-    args: Tuple[int, float, "InferenceServer"]
-) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+def _play_single_game_with_server(args: Tuple[int, float, "InferenceServer"]) -> Samples:
     """Worker function for threaded parallel self-play with shared inference server."""
     simulations_per_move, temperature, inference_server = args
     return self_play_game(
@@ -80,6 +89,8 @@ def generate_training_data(
     parallel: bool = True,
     num_workers: int = None,
     parallel_network: bool = False,
+    lockstep_games: int = 32,
+    process_pool: Optional[ProcessPoolExecutor] = None,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Generate training data through self-play.
@@ -93,15 +104,17 @@ def generate_training_data(
         parallel: Whether to use parallel processing (faster but uses heuristic MCTS)
         num_workers: Number of parallel workers (defaults to CPU count)
         parallel_network: Use threaded parallel with shared inference server (MPS optimized)
+        lockstep_games: Games played in lockstep by sequential network-guided self-play
+        process_pool: Worker pool for parallel heuristic self-play, kept across
+            calls by train(); a temporary one is started if None
 
     Returns:
         states: Array of shape (num_samples, 43)
         policies: Array of shape (num_samples, 3)
         values: Array of shape (num_samples,)
     """
-    all_states = []
-    all_policies = []
-    all_values = []
+    # One stacked (states, policies, values) triple per game, concatenated once at the end
+    game_samples: List[Samples] = []
 
     if parallel_network and num_games >= 2:
         # Threaded parallel self-play with shared inference server (MPS optimized)
@@ -127,12 +140,7 @@ def generate_training_data(
                         desc=f"Self-play ({num_workers} threads, network)",
                     )
 
-                for future in games_iter:
-                    samples = future.result()
-                    for state, policy, value in samples:
-                        all_states.append(state)
-                        all_policies.append(policy)
-                        all_values.append(value)
+                game_samples.extend(future.result() for future in games_iter)
 
             # Print inference server stats
             stats = server.get_stats()
@@ -149,7 +157,13 @@ def generate_training_data(
 
         args_list = [(simulations_per_move, temperature, i) for i in range(num_games)]
 
-        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        executor = process_pool
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=num_workers, initializer=_init_self_play_worker
+            )
+        try:
+            # One task per game: a game takes far longer than its round trip
             futures = [executor.submit(_play_single_game, args) for args in args_list]
 
             games_iter = as_completed(futures)
@@ -158,35 +172,148 @@ def generate_training_data(
                     games_iter, total=num_games, desc=f"Self-play ({num_workers} workers)"
                 )
 
-            for future in games_iter:
-                samples = future.result()
-                for state, policy, value in samples:
-                    all_states.append(state)
-                    all_policies.append(policy)
-                    all_values.append(value)
+            game_samples.extend(future.result() for future in games_iter)
+        finally:
+            if process_pool is None:
+                executor.shutdown()
     else:
-        # Sequential self-play with network guidance
-        games_iter = range(num_games)
-        if show_progress:
-            games_iter = tqdm(games_iter, desc="Self-play games")
-
-        for _ in games_iter:
-            samples = self_play_game(
+        # Network-guided self-play, several games in lockstep so each batched
+        # evaluation covers leaves from all of them
+        progress = tqdm(total=num_games, desc="Self-play games") if show_progress else None
+
+        for start in range(0, num_games, lockstep_games):
+            n_games = min(lockstep_games, num_games - start)
+            games = self_play_games_parallel(
+                n_games,
                 network=network,
                 simulations=simulations_per_move,
                 temperature=temperature,
             )
 
-            for state, policy, value in samples:
-                all_states.append(state)
-                all_policies.append(policy)
-                all_values.append(value)
+            game_samples.extend(games)
 
-    return (
-        np.array(all_states, dtype=np.float32),
-        np.array(all_policies, dtype=np.float32),
-        np.array(all_values, dtype=np.float32),
+            if progress is not None:
+                progress.update(n_games)
+
+        if progress is not None:
+            progress.close()
+
+    if not game_samples:
+        return (
+            np.empty((0, STATE_ENCODING_SIZE), dtype=np.float32),
+            np.empty((0, POLICY_OUTPUT_SIZE), dtype=np.float32),
+            np.empty(0, dtype=np.float32),
+        )
+    states, policies, values = zip(*game_samples)
+    return np.concatenate(states), np.concatenate(policies), np.concatenate(values)
+
+
+def _cpu_copy(obj):
+    """Copy a (nested) state dict with every tensor cloned onto the CPU."""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {k: _cpu_copy(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_cpu_copy(v) for v in obj)
+    return obj
+
+
+class ReplayBuffer:
+    """
+    Self-play samples from the last few iterations, kept in preallocated arrays.
+
+    Each iteration is appended after the previous one and the oldest drops off
+    the front, so the live samples stay one contiguous slice that the training
+    dataset views without copying. The slice is only moved back to the start
+    (growing the arrays if needed) when it runs into the end.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._arrays = [
+            np.empty((0, STATE_ENCODING_SIZE), dtype=np.float32),
+            np.empty((0, POLICY_OUTPUT_SIZE), dtype=np.float32),
+            np.empty(0, dtype=np.float32),
+        ]
+        self._sizes = deque()  # Sample count of each iteration held, oldest first
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def add(self, states: np.ndarray, policies: np.ndarray, values: np.ndarray) -> None:
+        """Append one iteration's samples, dropping iterations beyond the window."""
+        while self._sizes and len(self._sizes) >= self.window:
+            self._start += self._sizes.popleft()
+
+        n = len(states)
+        live = len(self)
+        capacity = len(self._arrays[0])
+        if self._end + n > capacity:
+            if live + n > capacity:
+                # Leave room for the next iterations so moves stay rare
+                grown = [
+                    np.empty((2 * (live + n),) + a.shape[1:], dtype=a.dtype)
+                    for a in self._arrays
+                ]
+                for new, old in zip(grown, self._arrays):
+                    new[:live] = old[self._start:self._end]
+                self._arrays = grown
+            else:
+                for a in self._arrays:
+                    a[:live] = a[self._start:self._end]
+            self._start, self._end = 0, live
+
+        for a, new in zip(self._arrays, (states, policies, values)):
+            a[self._end:self._end + n] = new
+        self._end += n
+        self._sizes.append(n)
+
+    def dataset(self) -> TensorDataset:
+        """
+        Dataset over the live samples, sharing memory with the buffer.
+
+        Values come out shaped (N, 1) to match the value head's output.
+        """
+        states, policies, values = (
+            torch.from_numpy(a[self._start:self._end]) for a in self._arrays
+        )
+        return TensorDataset(states, policies, values.unsqueeze(1))
+
+
+def _combined_loss(
+    log_policy: torch.Tensor,
+    policies: torch.Tensor,
+    pred_value: torch.Tensor,
+    values: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Total, policy and value loss; on CUDA, torch.compile fuses them into the step."""
+    # Policy loss: cross-entropy (negative log likelihood with soft targets)
+    policy_loss = -(policies * log_policy).sum(dim=1).mean()
+    # Value loss: MSE
+    value_loss = ((pred_value - values) ** 2).mean()
+    return policy_loss + value_loss, policy_loss, value_loss
+
+
+def _forward_losses(
+    network: PolicyValueNetwork,
+    states: torch.Tensor,
+    policies: torch.Tensor,
+    values: torch.Tensor,
+    amp_dtype: Optional[torch.dtype] = None,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Forward pass and losses for one batch: the part of a step torch.compile can take whole."""
+    autocast = (
+        torch.autocast(device_type=states.device.type, dtype=amp_dtype)
+        if amp_dtype is not None else nullcontext()
     )
+    with autocast:
+        log_policy, pred_value = network(states)
+
+    # Losses in FP32 either way
+    return _combined_loss(log_policy.float(), policies, pred_value.float(), values)
 
 
 def train_epoch(
@@ -194,52 +321,60 @@ def train_epoch(
     optimizer: optim.Optimizer,
     dataloader: DataLoader,
     device: torch.device,
+    amp_dtype: Optional[torch.dtype] = None,
+    scaler: Optional[torch.amp.GradScaler] = None,
+    forward_losses: Callable = _forward_losses,
 ) -> Tuple[float, float, float]:
     """
     Train for one epoch.
     
+    Args:
+        amp_dtype: Run the forward pass under autocast at this dtype (None for FP32)
+        scaler: Gradient scaler, needed when amp_dtype is float16
+        forward_losses: _forward_losses, or a compiled version of it
+    
     Returns:
         total_loss, policy_loss, value_loss (averaged over batches)
     """
     network.train()
     
-    total_loss_sum = 0.0
-    policy_loss_sum = 0.0
-    value_loss_sum = 0.0
+    # Accumulate on the device; reading back per batch would sync every step
+    total_loss_sum = torch.zeros((), device=device)
+    policy_loss_sum = torch.zeros((), device=device)
+    value_loss_sum = torch.zeros((), device=device)
     num_batches = 0
     
     for states, policies, values in dataloader:
-        states = states.to(device)
-        policies = policies.to(device)
-        values = values.to(device).unsqueeze(1)
+        # Asynchronous when the loader pins its batches (CUDA); a no-op copy on CPU
+        states = states.to(device, non_blocking=True)
+        policies = policies.to(device, non_blocking=True)
+        values = values.to(device, non_blocking=True)
         
-        optimizer.zero_grad()
+        optimizer.zero_grad(set_to_none=True)
         
         # Forward pass
-        log_policy, pred_value = network(states)
-        
-        # Policy loss: cross-entropy (negative log likelihood with soft targets)
-        policy_loss = -torch.sum(policies * log_policy, dim=1).mean()
-        
-        # Value loss: MSE
-        value_loss = nn.functional.mse_loss(pred_value, values)
-        
-        # Total loss
-        total_loss = policy_loss + value_loss
+        total_loss, policy_loss, value_loss = forward_losses(
+            network, states, policies, values, amp_dtype
+        )
         
         # Backward pass
-        total_loss.backward()
-        optimizer.step()
+        if scaler is not None:
+            scaler.scale(total_loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
+        else:
+            total_loss.backward()
+            optimizer.step()
         
-        total_loss_sum += total_loss.item()
-        policy_loss_sum += policy_loss.item()
-        value_loss_sum += value_loss.item()
+        total_loss_sum += total_loss.detach()
+        policy_loss_sum += policy_loss.detach()
+        value_loss_sum += value_loss.detach()
         num_batches += 1
     
     return (
-        total_loss_sum / num_batches,
-        policy_loss_sum / num_batches,
-        value_loss_sum / num_batches,
+        total_loss_sum.item() / num_batches,
+        policy_loss_sum.item() / num_batches,
+        value_loss_sum.item() / num_batches,
     )
 
 
@@ -262,6 +397,7 @@ def train(
     start_iteration: int = 0,
     replay_window: int = 3,
     resume_checkpoint: dict = None,
+    lockstep_games: int = 32,
 ) -> PolicyValueNetwork:
     """
     Main training loop.
@@ -278,10 +414,28 @@ def train(
         parallel_network: Use threaded parallel with shared inference server (MPS optimized)
         use_wandb: Enable Weights & Biases logging
         start_iteration: Starting iteration number (for resumed training)
+        lockstep_games: Games played in lockstep by sequential network-guided self-play
     """
     if device is None:
         device = get_device()
 
+    # Let CUDA matmuls use TF32 tensor cores (Ampere+); ample precision for RL training
+    if device.type == "cuda":
+        torch.set_float32_matmul_precision("high")
+
+    # Mixed precision on CUDA: BF16 where supported (no loss scaling needed),
+    # otherwise FP16 with a gradient scaler
+    amp_dtype = None
+    scaler = None
+    if device.type == "cuda":
+        # Native BF16 needs Ampere (compute capability 8.0) or newer;
+        # is_bf16_supported() would also accept slow emulation on older GPUs
+        if torch.cuda.get_device_capability(device)[0] >= 8:
+            amp_dtype = torch.bfloat16
+        else:
+            amp_dtype = torch.float16
+            scaler = torch.amp.GradScaler("cuda")
+
     network = network.to(device)
 
     # Apply torch.compile for MPS optimization (significant speedup on Apple Silicon)
@@ -292,6 +446,30 @@ def train(
         except Exception as e:
             print(f"  torch.compile not available: {e}")
 
+    # On CUDA, compile the whole forward + loss so they fuse into a few kernels;
+    # reduce-overhead replays them as CUDA graphs to cut launch cost further.
+    # Every batch is full (see the sampler below), so one static shape suffices.
+    forward_losses = _forward_losses
+    if device.type == "cuda" and hasattr(torch, "compile"):
+        try:
+            compiled = torch.compile(
+                _forward_losses, mode="reduce-overhead", dynamic=False
+            )
+            # Compilation is lazy: run one dummy batch so failures land here,
+            # where eager mode can take over, rather than mid-epoch
+            network.train()
+            compiled(
+                network,
+                torch.zeros(batch_size, STATE_ENCODING_SIZE, device=device),
+                torch.zeros(batch_size, POLICY_OUTPUT_SIZE, device=device),
+                torch.zeros(batch_size, 1, device=device),
+                amp_dtype,
+            )
+            forward_losses = compiled
+            print("  Applied torch.compile(mode='reduce-overhead') to the training step")
+        except Exception as e:
+            print(f"  torch.compile not available: {e}")
+
     optimizer = optim.Adam(network.parameters(), lr=learning_rate)
     scheduler = optim.lr_scheduler.ExponentialLR(optimizer, gamma=lr_decay)
 
@@ -306,141 +484,188 @@ def train(
 
     os.makedirs(output_dir, exist_ok=True)
     
+    # Parallel heuristic self-play reuses one worker pool across iterations rather
+    # than starting fresh processes every time; it is shut down at the switch
+    # to network-guided self-play
+    process_pool = None
+    if parallel and switch_to_network_at > 0 and games_per_iteration >= 4:
+        pool_workers = num_workers or min(cpu_count(), games_per_iteration, 8)
+        process_pool = ProcessPoolExecutor(
+            max_workers=pool_workers, initializer=_init_self_play_worker
+        )
+
+    # Checkpoints are written on a background thread so the next iteration's
+    # self-play doesn't wait on the disk
+    checkpoint_executor = ThreadPoolExecutor(max_workers=1)
+    pending_save = None
+
     # Accumulated training data (limit to recent iterations to avoid stale value targets)
-    all_states = []
-    all_policies = []
-    all_values = []
+    replay = ReplayBuffer(replay_window)
+
+    # While a CUDA device computes, a couple of loader workers collate the next
+    # batches on otherwise idle cores. On MPS and CPU, multiprocess overhead
+    # exceeds the benefit for these small tensors (and on CPU they would
+    # compete with the training math itself).
+    loader_workers = min(2, cpu_count() // 2) if device.type == "cuda" else 0
     
-    for iteration in range(num_iterations):
-        global_iteration = start_iteration + iteration + 1
-        print(f"\n=== Iteration {iteration + 1}/{num_iterations} (global: {global_iteration}) ===")
-        current_lr = optimizer.param_groups[0]['lr']
-        print(f"Learning rate: {current_lr:.6f}")
-        
-        # Switch to network-guided self-play after initial iterations
-        use_parallel = parallel and (iteration < switch_to_network_at)
-        use_parallel_network = parallel_network and not use_parallel
-        if iteration == switch_to_network_at and parallel:
-            if parallel_network:
-                print("Switching to parallel network-guided self-play (threaded with inference server)")
+    try:
+        for iteration in range(num_iterations):
+            global_iteration = start_iteration + iteration + 1
+            print(f"\n=== Iteration {iteration + 1}/{num_iterations} (global: {global_iteration}) ===")
+            current_lr = optimizer.param_groups[0]['lr']
+            print(f"Learning rate: {current_lr:.6f}")
+            
+            # Switch to network-guided self-play after initial iterations
+            use_parallel = parallel and (iteration < switch_to_network_at)
+            use_parallel_network = parallel_network and not use_parallel
+            if not use_parallel and process_pool is not None:
+                process_pool.shutdown()
+                process_pool = None
+            if iteration == switch_to_network_at and parallel:
+                if parallel_network:
+                    print("Switching to parallel network-guided self-play (threaded with inference server)")
+                else:
+                    print("Switching to network-guided self-play for better quality data")
+
+            # Adaptive temperature: start exploratory, become more greedy
+            temperature = max(0.5, 1.0 - iteration * 0.02)
+
+            # Generate new games
+            if use_parallel:
+                mode_str = f"parallel ({num_workers or 'auto'} workers)"
+            elif use_parallel_network:
+                mode_str = f"parallel network ({num_workers or 4} threads)"
             else:
-                print("Switching to network-guided self-play for better quality data")
+                mode_str = "network-guided"
+            print(f"Generating {games_per_iteration} self-play games ({mode_str}, temp={temperature:.2f})...")
+            start_time = time.time()
 
-        # Adaptive temperature: start exploratory, become more greedy
-        temperature = max(0.5, 1.0 - iteration * 0.02)
-
-        # Generate new games
-        if use_parallel:
-            mode_str = f"parallel ({num_workers or 'auto'} workers)"
-        elif use_parallel_network:
-            mode_str = f"parallel network ({num_workers or 4} threads)"
-        else:
-            mode_str = "network-guided"
-        print(f"Generating {games_per_iteration} self-play games ({mode_str}, temp={temperature:.2f})...")
-        start_time = time.time()
-
-        states, policies, values = generate_training_data(
-            network=network,
-            num_games=games_per_iteration,
-            simulations_per_move=simulations_per_move,
-            temperature=temperature,
-            parallel=use_parallel,
-            num_workers=num_workers,
-            parallel_network=use_parallel_network,
-        )
-        
-        elapsed = time.time() - start_time
-        games_per_sec = games_per_iteration / elapsed if elapsed > 0 else 0
-        print(f"Generated {len(states)} samples in {elapsed:.1f}s ({games_per_sec:.1f} games/s)")
-        
-        # Add to accumulated data
-        all_states.append(states)
-        all_policies.append(policies)
-        all_values.append(values)
-
-        # Trim to keep only last N iterations (avoid stale value targets)
-        while len(all_states) > replay_window:
-            all_states.pop(0)
-            all_policies.pop(0)
-            all_values.pop(0)
-
-        # Create dataset from accumulated data
-        combined_states = np.concatenate(all_states)
-        combined_policies = np.concatenate(all_policies)
-        combined_values = np.concatenate(all_values)
-        
-        dataset = TensorDataset(
-            torch.from_numpy(combined_states),
-            torch.from_numpy(combined_policies),
-            torch.from_numpy(combined_values),
-        )
-        # num_workers=0 for MPS - multiprocess overhead exceeds benefits for small tensors
-        dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=0)
-        
-        # Train
-        print(f"Training on {len(combined_states)} samples...")
-        for epoch in range(epochs_per_iteration):
-            total_loss, policy_loss, value_loss = train_epoch(
-                network, optimizer, dataloader, device
+            states, policies, values = generate_training_data(
+                network=network,
+                num_games=games_per_iteration,
+                simulations_per_move=simulations_per_move,
+                temperature=temperature,
+                parallel=use_parallel,
+                num_workers=num_workers,
+                parallel_network=use_parallel_network,
+                lockstep_games=lockstep_games,
+                process_pool=process_pool,
             )
-            print(f"  Epoch {epoch + 1}/{epochs_per_iteration}: "
-                  f"loss={total_loss:.4f} (policy={policy_loss:.4f}, value={value_loss:.4f})")
-
-            # Log epoch metrics to wandb
-            if use_wandb and WANDB_AVAILABLE:
-                metrics = {
-                    "epoch": (iteration * epochs_per_iteration) + epoch + 1,
-                    "iteration": global_iteration,
-                    "loss/total": total_loss,
-                    "loss/policy": policy_loss,
-                    "loss/value": value_loss,
-                    "learning_rate": current_lr,
-                    "samples": len(combined_states),
-                    "games_per_sec": games_per_sec,
-                }
-                wandb.log(metrics)
-                print(f"    [wandb] logged: loss={total_loss:.4f}")
-
-        # Step the learning rate scheduler
-        scheduler.step()
-
-        # Save checkpoint
-        checkpoint_path = os.path.join(output_dir, f"checkpoint_{global_iteration}.pt")
-        torch.save({
-            "iteration": global_iteration,
-            "model_state_dict": network.state_dict(),
-            "optimizer_state_dict": optimizer.state_dict(),
-            "scheduler_state_dict": scheduler.state_dict(),
-        }, checkpoint_path)
-        print(f"Saved checkpoint to {checkpoint_path}")
-
-        # Log checkpoint as wandb artifact for version control
-        if use_wandb:
-            artifact = wandb.Artifact(
-                name=f"checkpoint-{global_iteration}",
-                type="model",
-                metadata={
-                    "iteration": global_iteration,
-                    "loss": total_loss,
-                    "policy_loss": policy_loss,
-                    "value_loss": value_loss,
-                    "learning_rate": current_lr,
-                },
+            
+            elapsed = time.time() - start_time
+            games_per_sec = games_per_iteration / elapsed if elapsed > 0 else 0
+            print(f"Generated {len(states)} samples in {elapsed:.1f}s ({games_per_sec:.1f} games/s)")
+            
+            # Add to accumulated data, dropping iterations beyond the replay window
+            replay.add(states, policies, values)
+            dataset = replay.dataset()
+
+            # Pinned batches let train_epoch copy to a CUDA device without blocking
+            # (MPS shares host memory, so there is nothing to pin for it). The
+            # loader lives for the iteration, so persistent workers are started
+            # once rather than every epoch. Batches are drawn with replacement,
+            # so an epoch needs no full permutation of the replay window, and
+            # rounding it up to whole batches keeps every batch the same shape
+            # for the compiled step.
+            num_samples = -(-len(dataset) // batch_size) * batch_size
+            dataloader = DataLoader(
+                dataset,
+                batch_size=batch_size,
+                sampler=RandomSampler(dataset, replacement=True, num_samples=num_samples),
+                num_workers=loader_workers,
+                persistent_workers=loader_workers > 0,
+                prefetch_factor=2 if loader_workers > 0 else None,
+                pin_memory=device.type == "cuda",
             )
-            artifact.add_file(checkpoint_path)
-            wandb.log_artifact(artifact)
-            print(f"    [wandb] logged artifact: checkpoint-{global_iteration}")
+            
+            # Train
+            print(f"Training on {len(replay)} samples...")
+            for epoch in range(epochs_per_iteration):
+                total_loss, policy_loss, value_loss = train_epoch(
+                    network, optimizer, dataloader, device,
+                    amp_dtype=amp_dtype, scaler=scaler, forward_losses=forward_losses,
+                )
+                print(f"  Epoch {epoch + 1}/{epochs_per_iteration}: "
+                      f"loss={total_loss:.4f} (policy={policy_loss:.4f}, value={value_loss:.4f})")
+
+                # Log epoch metrics to wandb
+                if use_wandb and WANDB_AVAILABLE:
+                    metrics = {
+                        "epoch": (iteration * epochs_per_iteration) + epoch + 1,
+                        "iteration": global_iteration,
+                        "loss/total": total_loss,
+                        "loss/policy": policy_loss,
+                        "loss/value": value_loss,
+                        "learning_rate": current_lr,
+                        "samples": len(replay),
+                        "games_per_sec": games_per_sec,
+                    }
+                    wandb.log(metrics)
+                    print(f"    [wandb] logged: loss={total_loss:.4f}")
+
+            # Step the learning rate scheduler
+            scheduler.step()
+
+            # Save checkpoint
+            checkpoint_path = os.path.join(output_dir, f"checkpoint_{global_iteration}.pt")
+            if pending_save is not None:
+                pending_save.result()  # Raise any error from the previous write
+            # Snapshot now: training keeps updating the live tensors in place
+            checkpoint = _cpu_copy({
+                "iteration": global_iteration,
+                "model_state_dict": network.state_dict(),
+                "optimizer_state_dict": optimizer.state_dict(),
+                "scheduler_state_dict": scheduler.state_dict(),
+            })
+            pending_save = checkpoint_executor.submit(torch.save, checkpoint, checkpoint_path)
+            print(f"Saving checkpoint to {checkpoint_path}")
+
+            # Log checkpoint as wandb artifact for version control
+            if use_wandb:
+                pending_save.result()  # The artifact needs the finished file
+                artifact = wandb.Artifact(
+                    name=f"checkpoint-{global_iteration}",
+                    type="model",
+                    metadata={
+                        "iteration": global_iteration,
+                        "loss": total_loss,
+                        "policy_loss": policy_loss,
+                        "value_loss": value_loss,
+                        "learning_rate": current_lr,
+                    },
+                )
+                artifact.add_file(checkpoint_path)
+                wandb.log_artifact(artifact)
+                print(f"    [wandb] logged artifact: checkpoint-{global_iteration}")
+        
+    finally:
+        # Also runs on an error or Ctrl-C, so no worker processes are left
+        # behind and the last checkpoint write is finished (or its error raised)
+        if process_pool is not None:
+            process_pool.shutdown(cancel_futures=True)
+        try:
+            if pending_save is not None:
+                pending_save.result()
+        finally:
+            checkpoint_executor.shutdown()
     
     return network
 
 
 def export_weights(network: PolicyValueNetwork, output_path: str) -> None:
-    """Export network weights to JSON format for WASM loading."""
+    """
+    Export network weights for WASM loading.
+
+    A ".bin" path gets the raw little-endian float32 array (readable in JS as
+    new Float32Array(buffer)); any other path gets a JSON list.
+    """
     weights = network.export_weights()
     
-    # Save as JSON
-    with open(output_path, "w") as f:
-        json.dump(weights.tolist(), f)
+    if output_path.endswith(".bin"):
+        weights.astype("<f4", copy=False).tofile(output_path)
+    else:
+        with open(output_path, "w") as f:
+            json.dump(weights.tolist(), f)
     
     print(f"Exported {len(weights)} weights to {output_path}")
 
@@ -455,7 +680,8 @@ def main():
     parser.add_argument("--lr", type=float, default=0.001, help="Learning rate")
     parser.add_argument("--lr-decay", type=float, default=0.95, help="LR decay per iteration (0.95 = 5%% decay)")
     parser.add_argument("--output-dir", type=str, default="checkpoints", help="Output directory")
-    parser.add_argument("--export", type=str, default="weights.json", help="Export weights path")
+    parser.add_argument("--export", type=str, default="weights.json",
+                        help="Export weights path (.bin for raw float32, otherwise JSON)")
     parser.add_argument("--resume", type=str, default=None, help="Resume from checkpoint")
     parser.add_argument("--no-parallel", action="store_true", help="Disable parallel self-play entirely")
     parser.add_argument("--parallel-network", action="store_true",
@@ -468,6 +694,8 @@ def main():
     parser.add_argument("--wandb-name", type=str, default=None, help="W&B run name")
     parser.add_argument("--replay-window", type=int, default=3,
                         help="Number of iterations to keep in replay buffer (default: 3)")
+    parser.add_argument("--lockstep-games", type=int, default=32,
+                        help="Games played in lockstep by network-guided self-play (default: 32)")
 
     args = parser.parse_args()
     
@@ -535,6 +763,7 @@ def main():
                 "device": str(device),
                 "start_iteration": start_iteration,
                 "replay_window": args.replay_window,
+                "lockstep_games": args.lockstep_games,
             },
             resume="allow",
         )
@@ -559,6 +788,7 @@ def main():
         start_iteration=start_iteration,
         replay_window=args.replay_window,
         resume_checkpoint=resume_checkpoint,
+        lockstep_games=args.lockstep_games,
     )
 
     # Finish wandb run